@@ -212,12 +212,12 @@ def create_app(test_config: dict | None = None):  # noqa: C901 complex
         # DB is older than today, trigger one immediately on startup.
         # -----------------------------------------------------------------
         try:
-            from datetime import date
             from sqlalchemy import func
             from app.models.trading import StrategyValueHistory
 
+            # Snapshot timestamps are naive UTC; compare against the UTC date
             last = db.session.query(func.max(StrategyValueHistory.timestamp)).scalar()
-            if not last or last.date() < date.today():
+            if not last or last.date() < datetime.utcnow().date():
                 app.logger.info("No strategy snapshot for today – running catch-up …")
                 # Use the imported function from the scheduler section above
                 with app.app_context():
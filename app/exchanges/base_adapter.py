@@ -1,7 +1,8 @@
 # app/exchanges/base_adapter.py
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Tuple # Added Any
+from contextlib import nullcontext
+from typing import ContextManager, Dict, List, Any, Tuple # Added Any
 from app.models.exchange_credentials import ExchangeCredentials
 from app.models.portfolio import Portfolio
 
@@ -156,6 +157,15 @@ class ExchangeAdapter(ABC):
         """
         pass
 
+    @classmethod
+    def client_lock(cls, user_id: int, portfolio_name: str = 'default') -> ContextManager:
+        """
+        Return a context manager to hold while using the client from
+        get_client. Adapters whose clients are shared between threads
+        override this with a real lock; the default does not block.
+        """
+        return nullcontext()
+
     @classmethod
     def get_default_portfolio_name(cls) -> str:
         """
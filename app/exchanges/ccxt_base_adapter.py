@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import functools
 import logging
+import threading
 import time
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
@@ -24,6 +26,36 @@ def _make_key_ccxt_client(cls, user_id, portfolio_name="default"):
     return f"ccxt_client:{cls.get_name()}:{user_id}:{portfolio_name}"
 
 
+# Live clients kept per process: unlike the pickled shared-cache copy they keep
+# their loaded markets and HTTP session between trades. Entries expire so a
+# credential change made through another worker is picked up within the TTL.
+_LIVE_CLIENT_TTL = 300.0
+_live_clients: Dict[str, Tuple[Any, float]] = {}
+_live_clients_lock = threading.Lock()  # guards the dict only, never a build
+# One re-entrant lock per client key; ccxt clients are not thread-safe and the
+# live client above is shared by every thread in the process
+_client_locks: Dict[str, Any] = {}
+_client_locks_lock = threading.Lock()
+
+
+def _get_live_client(key):
+    """Return the unexpired live client stored under *key*, or None."""
+    with _live_clients_lock:
+        entry = _live_clients.get(key)
+    if entry is not None and entry[1] > time.monotonic():
+        return entry[0]
+    return None
+
+
+def _holding_client_lock(func):
+    """Run an adapter classmethod taking ``user_id`` under that user's client lock."""
+    @functools.wraps(func)
+    def wrapper(cls, user_id, *args, **kwargs):
+        with cls.client_lock(user_id):
+            return func(cls, user_id, *args, **kwargs)
+    return wrapper
+
+
 def _make_key_ccxt_get_portfolio_value(
     cls, user_id, portfolio_id, target_currency="USD"
 ):
@@ -66,8 +98,71 @@ class CcxtBaseAdapter(ExchangeAdapter):
         )
 
     @classmethod
-    @cache.cached(timeout=600, make_cache_key=_make_key_ccxt_client)
     def get_client(cls, user_id: int, portfolio_name: str = "default"):
+        """Return the ccxt client for *user_id*, memoised in this process.
+
+        A single trade asks for the client several times (ticker, balance,
+        precision, order) and background trades start without any request
+        state, so the live client is kept per process rather than re-read and
+        unpickled from the shared cache on each call.
+
+        The same instance is handed to every thread, and ccxt clients are not
+        thread-safe: hold ``client_lock(user_id, portfolio_name)`` for as long
+        as the returned client is in use.
+        """
+        key = _make_key_ccxt_client(cls, user_id, portfolio_name)
+        client = _get_live_client(key)
+        if client is not None:
+            return client
+
+        # Build under this key's lock only: the credentials query, decrypt and
+        # ccxt setup never block other users, and concurrent misses for the
+        # same key wait here and share the one client
+        with cls.client_lock(user_id, portfolio_name):
+            client = _get_live_client(key)
+            if client is not None:
+                return client
+
+            client = cls._get_cached_client(user_id, portfolio_name)
+            if client is not None:
+                with _live_clients_lock:
+                    now = time.monotonic()
+                    # Entries expire _LIVE_CLIENT_TTL seconds after they were
+                    # built (hits do not extend them); sweep the expired ones so
+                    # users who traded once do not pin their client forever
+                    for stale_key in [k for k, (_, expires) in _live_clients.items() if expires <= now]:
+                        del _live_clients[stale_key]
+                    _live_clients[key] = (client, now + _LIVE_CLIENT_TTL)
+            return client
+
+    @classmethod
+    def client_lock(cls, user_id: int, portfolio_name: str = "default"):
+        """Return the re-entrant lock serialising use of one live client.
+
+        Locks outlive client expiry so a thread still holding one never races
+        a fresh lock for the same key; there is at most one per credential.
+        """
+        key = _make_key_ccxt_client(cls, user_id, portfolio_name)
+        with _client_locks_lock:
+            lock = _client_locks.get(key)
+            if lock is None:
+                lock = _client_locks[key] = threading.RLock()
+            return lock
+
+    @classmethod
+    def invalidate_client(cls, user_id: int, portfolio_name: str = "default") -> None:
+        """Forget cached clients for *user_id* after its credentials change."""
+        key = _make_key_ccxt_client(cls, user_id, portfolio_name)
+        # The key lock keeps a build already in progress from storing a client
+        # made from the old credentials after this returns
+        with cls.client_lock(user_id, portfolio_name):
+            with _live_clients_lock:
+                _live_clients.pop(key, None)
+            cache.delete(key)
+
+    @classmethod
+    @cache.cached(timeout=600, make_cache_key=_make_key_ccxt_client)
+    def _get_cached_client(cls, user_id: int, portfolio_name: str = "default"):
         creds = ExchangeCredentials.query.filter_by(
             user_id=user_id, exchange=cls.get_name(), portfolio_name=portfolio_name
         ).first()
@@ -112,6 +207,7 @@ class CcxtBaseAdapter(ExchangeAdapter):
 
     @classmethod
     @circuit_breaker("ccxt_api")
+    @_holding_client_lock
     def get_trading_pairs(cls, user_id: int) -> List[Dict[str, Any]]:
         client = cls.get_client(user_id)
         if not client:
@@ -136,6 +232,7 @@ class CcxtBaseAdapter(ExchangeAdapter):
 
     @classmethod
     @circuit_breaker("ccxt_api")
+    @_holding_client_lock
     def get_ticker(cls, user_id: int, trading_pair: str) -> Dict[str, Any]:
         """
         Fetches the ticker information for a given trading pair.
@@ -176,6 +273,7 @@ class CcxtBaseAdapter(ExchangeAdapter):
     @classmethod
     @cache.cached(timeout=60, make_cache_key=_make_key_ccxt_get_portfolio_value)
     @circuit_breaker("ccxt_api_portfolio_value")
+    @_holding_client_lock
     def get_portfolio_value(
         cls, user_id: int, portfolio_id: int, target_currency: str = "USD"
     ) -> Dict[str, Any]:
@@ -488,7 +586,8 @@ class CcxtBaseAdapter(ExchangeAdapter):
                             # ExchangeError as a signal to step down and retry. On other exchanges, only retry
                             # for explicit insufficient fund messages.
                             is_coinbase = getattr(client, 'id', '').lower().startswith('coinbase')
-                            insufficient = ('INSUFFICIENT_FUND' in emsg) or ('PREVIEW_INSUFFICIENT_FUND' in emsg)
+                            # One scan: 'PREVIEW_INSUFFICIENT_FUND' contains this marker too
+                            insufficient = 'INSUFFICIENT_FUND' in emsg
                             if is_coinbase or insufficient:
                                 # Reduce by one more step and retry
                                 new_amount = (attempt_amount - step)
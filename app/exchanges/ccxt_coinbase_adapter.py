@@ -121,12 +121,15 @@ class CcxtCoinbaseAdapter(CcxtBaseAdapter):
                         if complete_order.get('filled') is not None:
                             logger.info(f"Successfully retrieved filled amount: {complete_order.get('filled')}")
                             break
-                            
-                        logger.info(f"Order not yet filled, retrying in {retry_delay} seconds...")
-                        time.sleep(retry_delay)
-                        retry_delay *= 1.5  # Increase delay for next attempt
+
+                        logger.info("Order not yet filled")
                     except Exception as fetch_error:
                         logger.error(f"Error fetching order details: {fetch_error}")
+
+                    # Back off before the next attempt only; waiting after the last one
+                    # would just delay the fallback below
+                    if attempt + 1 < max_retries:
+                        logger.info(f"Retrying in {retry_delay} seconds...")
                         time.sleep(retry_delay)
                         retry_delay *= 1.5  # Increase delay for next attempt
                 
@@ -27,6 +27,11 @@ class ExchangeCredentials(db.Model):
     user = db.relationship('User', backref=db.backref('credentials', lazy=True))
     automation = db.relationship('Automation', backref=db.backref('credentials', lazy=True))
     portfolio = db.relationship('Portfolio', backref=db.backref('credentials', lazy=True))
+
+    # Adapters and routes resolve credentials by (user, exchange) on every client build
+    __table_args__ = (
+        db.Index('ix_exchange_credentials_user_exchange', 'user_id', 'exchange'),
+    )
     
     def __init__(self, user_id, exchange, portfolio_name, api_key, api_secret, 
                  automation_id=None, portfolio_id=None, is_default=False, passphrase=None):
@@ -17,7 +17,7 @@ class TradingStrategy(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     name = db.Column(db.String(100), nullable=False)
-    exchange_credential_id = db.Column(db.Integer, db.ForeignKey('exchange_credentials.id'), nullable=False)
+    exchange_credential_id = db.Column(db.Integer, db.ForeignKey('exchange_credentials.id'), nullable=False, index=True)
     trading_pair = db.Column(db.String(50), nullable=False)  # e.g., "BTC/USDC"
     base_asset_symbol = db.Column(db.String(20), nullable=False)  # e.g., "BTC"
     quote_asset_symbol = db.Column(db.String(20), nullable=False)  # e.g., "USDC"
@@ -44,6 +44,9 @@ class TradingStrategy(db.Model):
 
 class StrategyValueHistory(db.Model):
     __tablename__ = 'strategy_value_history'
+    __table_args__ = (
+        db.Index('ix_strategy_value_history_strategy_timestamp', 'strategy_id', 'timestamp'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     strategy_id = db.Column(db.Integer, db.ForeignKey('trading_strategies.id'), nullable=False)
@@ -58,6 +58,10 @@ class WebhookLog(db.Model):
     idempotency_hash = Column(String(64), index=True, nullable=True)  # Hash of the payload for idempotency
     """Model for storing webhook execution logs"""
     __tablename__ = 'webhook_logs'
+    # Log views filter by strategy and page newest-first
+    __table_args__ = (
+        db.Index('ix_webhook_logs_strategy_timestamp', 'strategy_id', 'timestamp'),
+    )
     
     id = Column(Integer, primary_key=True)
     
@@ -74,7 +78,7 @@ class WebhookLog(db.Model):
     status = db.Column(db.String(20), nullable=True)  # 'success' or 'error'
     message = db.Column(db.Text, nullable=True)
     order_id = db.Column(db.String(50), nullable=True)
-    client_order_id = db.Column(db.String(36), nullable=True)
+    client_order_id = db.Column(db.String(36), nullable=True, index=True)
     raw_response = db.Column(db.Text, nullable=True)
     
     # Store strategy and exchange names directly for better historical tracking
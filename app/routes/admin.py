@@ -4,6 +4,7 @@ from app.models.user import User
 from app.models.automation import Automation  # Legacy
 from app.models.trading import TradingStrategy, AssetTransferLog
 from app.models.exchange_credentials import ExchangeCredentials
+from app.exchanges.registry import ExchangeRegistry
 from app.models.webhook import WebhookLog
 from sqlalchemy import func
 from app import db
@@ -253,8 +254,12 @@ def strategies():
 def delete_api_keys_admin(cred_id: int):
     try:
         cred = ExchangeCredentials.query.get_or_404(cred_id)
+        user_id, exchange, portfolio_name = cred.user_id, cred.exchange, cred.portfolio_name
         db.session.delete(cred)
         db.session.commit()
+        adapter_cls = ExchangeRegistry.get_adapter(exchange)
+        if hasattr(adapter_cls, 'invalidate_client'):
+            adapter_cls.invalidate_client(user_id, portfolio_name)
         return jsonify({"success": True})
     except Exception as e:
         db.session.rollback()
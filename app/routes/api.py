@@ -618,14 +618,15 @@ def get_all_logs():
             # Match logs by explicit exchange_name OR by strategies linked to credentials on this exchange
             from ..models import Automation
             # Determine all strategy IDs for current user on this exchange to broaden search
-            user_creds = ExchangeCredentials.query.filter_by(user_id=current_user.id, exchange=exchange_filter).all()
-            strategy_ids_for_exchange = []
-            strategy_names_for_exchange = []
-            if user_creds:
-                cred_ids = [c.id for c in user_creds]
-                strategies_for_exchange = TradingStrategy.query.filter(TradingStrategy.exchange_credential_id.in_(cred_ids)).all()
-                strategy_ids_for_exchange = [s.id for s in strategies_for_exchange]
-                strategy_names_for_exchange = [s.name for s in strategies_for_exchange]
+            strategies_for_exchange = (
+                db.session.query(TradingStrategy.id, TradingStrategy.name)
+                .join(ExchangeCredentials, TradingStrategy.exchange_credential_id == ExchangeCredentials.id)
+                .filter(ExchangeCredentials.user_id == current_user.id,
+                        ExchangeCredentials.exchange == exchange_filter)
+                .all()
+            )
+            strategy_ids_for_exchange = [s.id for s in strategies_for_exchange]
+            strategy_names_for_exchange = [s.name for s in strategies_for_exchange]
             logs_query = logs_query.filter(
                 or_(
                     WebhookLog.exchange_name == exchange_filter,
@@ -706,10 +707,15 @@ def get_all_logs():
             transfer_query = transfer_query.filter(or_(AssetTransferLog.strategy_id_from == strategy_id_filter,
                                                        AssetTransferLog.strategy_id_to == strategy_id_filter))
         elif strategy_filter:
-            strat_obj = TradingStrategy.query.filter_by(user_id=current_user.id, name=strategy_filter).first()
-            if strat_obj:
-                transfer_query = transfer_query.filter(or_(AssetTransferLog.strategy_id_from == strat_obj.id,
-                                                           AssetTransferLog.strategy_id_to == strat_obj.id))
+            strat_id = (
+                db.session.query(TradingStrategy.id)
+                .filter_by(user_id=current_user.id, name=strategy_filter)
+                .limit(1)
+                .scalar()
+            )
+            if strat_id:
+                transfer_query = transfer_query.filter(or_(AssetTransferLog.strategy_id_from == strat_id,
+                                                           AssetTransferLog.strategy_id_to == strat_id))
 
         transfer_rows = transfer_query.order_by(AssetTransferLog.timestamp.desc()).all()
 
@@ -827,18 +833,23 @@ def get_exchange_logs(exchange_id: str):
         except (ValueError, TypeError):
             per_page = 20
 
-        # First get all credentials for this exchange and user
-        exchange_credentials = ExchangeCredentials.query.filter_by(
-            user_id=current_user.id,
-            exchange=exchange_id
-        ).all()
-        if not exchange_credentials:
+        # Credentials for this exchange and user joined to their strategies in one query;
+        # the outer join keeps credentials without strategies so the 404 check still works
+        cred_strategy_rows = (
+            db.session.query(
+                ExchangeCredentials.id.label('credential_id'),
+                TradingStrategy.id,
+                TradingStrategy.name,
+            )
+            .outerjoin(TradingStrategy, TradingStrategy.exchange_credential_id == ExchangeCredentials.id)
+            .filter(ExchangeCredentials.user_id == current_user.id,
+                    ExchangeCredentials.exchange == exchange_id)
+            .all()
+        )
+        if not cred_strategy_rows:
             return jsonify({"error": "No credentials found for this exchange"}), 404
-        # Get all strategy IDs for these credentials
-        credential_ids = [cred.id for cred in exchange_credentials]
-        strategies = TradingStrategy.query.filter(
-            TradingStrategy.exchange_credential_id.in_(credential_ids)
-        ).all()
+        credential_ids = list(dict.fromkeys(row.credential_id for row in cred_strategy_rows))
+        strategies = [row for row in cred_strategy_rows if row.id is not None]
         strategy_ids = [strategy.id for strategy in strategies]
         if not strategy_ids:
             # Return empty logs if no strategies found
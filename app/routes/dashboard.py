@@ -281,6 +281,8 @@ def settings():
                         logger.info("Added new credentials for %s", form_exchange)
 
                     db.session.commit()
+                    if hasattr(adapter_cls, 'invalidate_client'):
+                        adapter_cls.invalidate_client(current_user.id, existing.portfolio_name if existing else 'default')
                     flash(f'{disp_name_try} API keys saved!', 'success')
                     return redirect(url_for('dashboard.settings'))
                 except Exception as e:
@@ -395,9 +397,14 @@ def delete_api_keys():
     ).all()
 
     if credentials_to_delete:
+        portfolio_names = {cred.portfolio_name for cred in credentials_to_delete}
         for cred in credentials_to_delete:
             db.session.delete(cred)
         db.session.commit()
+        adapter_cls = ExchangeRegistry.get_adapter(exchange_name_to_delete)
+        if hasattr(adapter_cls, 'invalidate_client'):
+            for portfolio_name in portfolio_names:
+                adapter_cls.invalidate_client(current_user.id, portfolio_name)
         capitalized_exchange_name = exchange_name_to_delete.capitalize()
         message = (
             f"All API keys for {capitalized_exchange_name} "
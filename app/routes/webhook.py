@@ -60,10 +60,8 @@ def webhook():
                 logger.error(f"Failed to convert payload to dict: {e}")
                 payload = {"raw_data": str(payload)}
         
-        # Format the webhook payload for clearer log readability
-        formatted_payload = json.dumps(payload, indent=2) if payload else "{}" 
         logger.info(f"Webhook received for {webhook_identifier}")
-        logger.info(f"Webhook Payload:\n{formatted_payload}")
+        logger.debug("Webhook Payload: %s", payload)
         logger.info(f"Final payload type before processing: {type(payload)}")
     except Exception as e:
         logger.error(f"Failed to parse JSON payload for identifier {webhook_identifier}: {e}")
@@ -8,19 +8,24 @@ from app.models.exchange_credentials import ExchangeCredentials
 from app.exchanges.registry import ExchangeRegistry
 import logging
 from datetime import datetime, timedelta
-from app.services.strategy_value_service import _value_usd
+from app.services.strategy_value_service import _fetch_prices_for, _value_usd, _value_usd_with_prices
 
 logger = logging.getLogger(__name__)
 
-def _snapshot_strategy_value(strategy: TradingStrategy, *, ts: datetime | None = None) -> None:
+def _snapshot_strategy_value(strategy: TradingStrategy, *, ts: datetime | None = None,
+                             asset_prices: dict | None = None) -> None:
     """Insert a StrategyValueHistory row reflecting *strategy*'s current value.
 
     *ts* allows the caller to supply an explicit timestamp so we can guarantee a
     strict ordering relative to a just-logged ``AssetTransferLog``.  When *ts*
-    is *None* the current UTC time is used.
+    is *None* the current UTC time is used.  *asset_prices* lets callers that
+    snapshot several strategies share one price fetch.
     """
     try:
-        val = _value_usd(strategy)
+        if asset_prices is None:
+            val = _value_usd(strategy)
+        else:
+            val = _value_usd_with_prices(strategy, asset_prices)
         snap_ts = ts or datetime.utcnow()
         db.session.add(
             StrategyValueHistory(
@@ -382,8 +387,9 @@ def execute_internal_asset_transfer(user_id: int, source_identifier: str, destin
             db.session.add(log_entry)
             # Snapshot both strategies since both allocations changed, with guaranteed later timestamps
             snap_ts = log_ts + timedelta(milliseconds=1)
-            _snapshot_strategy_value(source_strategy, ts=snap_ts)
-            _snapshot_strategy_value(destination_strategy, ts=snap_ts)
+            asset_prices = _fetch_prices_for(source_strategy, destination_strategy)
+            _snapshot_strategy_value(source_strategy, ts=snap_ts, asset_prices=asset_prices)
+            _snapshot_strategy_value(destination_strategy, ts=snap_ts, asset_prices=asset_prices)
             db.session.add(source_strategy)
             db.session.add(destination_strategy)
             db.session.commit()
@@ -1,8 +1,9 @@
 # app/services/exchange_service.py
 
 import logging
+from contextlib import nullcontext
 from decimal import Decimal, ROUND_DOWN
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, ContextManager, Dict, List, Optional, Tuple
 
 from app.exchanges.registry import ExchangeRegistry
 from app.models import ExchangeCredentials, Portfolio, TradingStrategy
@@ -40,6 +41,25 @@ class ExchangeService:
 
         return adapter.get_client(user_id, portfolio_name)
 
+    @staticmethod
+    def client_lock(user_id: int, exchange: str, portfolio_name: str = "default") -> ContextManager:
+        """
+        Get the lock to hold while using the client from get_client.
+
+        Args:
+            user_id: User ID
+            exchange: Exchange name
+            portfolio_name: Portfolio name
+
+        Returns:
+            Context manager serialising use of that client
+        """
+        adapter = ExchangeRegistry.get_adapter(exchange)
+        if not adapter:
+            return nullcontext()
+
+        return adapter.client_lock(user_id, portfolio_name)
+
     @staticmethod
     def get_portfolios(user_id: int, exchange: str, include_default: bool = False) -> List[str]:
         """
@@ -180,6 +200,10 @@ class ExchangeService:
         Handles trades for both Portfolios (automations) and main accounts
         (strategies).
 
+        The adapter's client lock for the credentials is held for the whole
+        trade: the live ccxt client is shared by every thread in the process
+        and is not thread-safe, so one user's trades here run one at a time.
+
         Args:
             credentials: The ExchangeCredentials object.
             portfolio: The Portfolio object (can be None for strategies).
@@ -193,6 +217,30 @@ class ExchangeService:
         Returns:
             Result of the trade execution.
         """
+        exchange = portfolio.exchange if portfolio else getattr(credentials, "exchange", None)
+        adapter = ExchangeRegistry.get_adapter(exchange) if exchange else None
+        if adapter is None or credentials is None:
+            lock = nullcontext()
+        else:
+            lock = adapter.client_lock(credentials.user_id, credentials.portfolio_name or "default")
+        with lock:
+            return ExchangeService._execute_trade(
+                credentials, portfolio, trading_pair, action, payload,
+                client_order_id, target_type, target_id,
+            )
+
+    @staticmethod
+    def _execute_trade(
+        credentials: ExchangeCredentials,
+        portfolio: Optional[Portfolio],
+        trading_pair: str,
+        action: str,
+        payload: Dict[str, Any],
+        client_order_id: str,
+        target_type: str,
+        target_id: int,
+    ) -> Dict[str, Any]:
+        """Body of execute_trade, run with the client lock held."""
         exchange = None
         if portfolio:
             exchange = portfolio.exchange
@@ -217,6 +265,9 @@ class ExchangeService:
                 "trade_status": "error",
             }
 
+        # Normalise the side once; the checks below compare it repeatedly
+        side = action.lower()
+
         if target_type == "strategy":
             strategy = TradingStrategy.query.get(target_id)
             if not strategy:
@@ -231,7 +282,7 @@ class ExchangeService:
             # ---------------- Allocation safeguard & determine amount ----------------
             requested_amount = payload.get("amount")
 
-            if action.lower() == "buy":
+            if side == "buy":
                 # For BUY we need latest market price first
                 ticker_info = ExchangeService.get_ticker_price(
                     credentials.user_id, exchange, trading_pair
@@ -284,7 +335,7 @@ class ExchangeService:
                     # Quantize to remove any precision artifacts beyond 9 decimal places
                     amount = amount.quantize(Decimal('0.000000001'), rounding=ROUND_DOWN)
 
-            elif action.lower() == "sell":
+            elif side == "sell":
                 if requested_amount is not None:
                     try:
                         requested_amount_dec = Decimal(str(requested_amount))
@@ -396,10 +447,10 @@ class ExchangeService:
             except Exception:
                 # Fallback to default 8 decimals if market metadata isn't available
                 quant = Decimal('0.00000001')
-            if action.lower() == 'sell':
+            if side == 'sell':
                 # Strict: quantize to exchange precision using ROUND_DOWN so we never exceed holdings
                 amount = amount.quantize(quant, rounding=ROUND_DOWN)
-            elif action.lower() == 'buy':
+            elif side == 'buy':
                 # Strict: quantize to exchange precision to avoid overspending
                 amount = amount.quantize(quant, rounding=ROUND_DOWN)
 
@@ -407,7 +458,7 @@ class ExchangeService:
             # to avoid PREVIEW_INSUFFICIENT_FUND due to exchange-side holds or micro-dust.
             # We base this on the smaller of (prepared amount, free balance) when free is known.
             try:
-                if action.lower() == 'sell' and isinstance(exchange, str) and 'coinbase' in exchange.lower():
+                if side == 'sell' and isinstance(exchange, str) and 'coinbase' in exchange.lower():
                     # Choose a high-water target constrained by free balance if known
                     target_high = amount
                     if 'free_dec' in locals() and isinstance(free_dec, Decimal) and free_dec > Decimal('0'):
@@ -450,7 +501,7 @@ class ExchangeService:
             # own amount_to_precision to ensure we end up strictly below what Coinbase will
             # accept after its rounding/truncation.
             try:
-                if action.lower() == 'sell' and isinstance(exchange, str) and 'coinbase' in exchange.lower() and cushion_steps >= 1:
+                if side == 'sell' and isinstance(exchange, str) and 'coinbase' in exchange.lower() and cushion_steps >= 1:
                     client = adapter.get_client(credentials.user_id, credentials.portfolio_name or "default")
                     if client is not None and hasattr(client, 'amount_to_precision'):
                         prec_str = client.amount_to_precision(trading_pair, float(amount))
@@ -474,7 +525,7 @@ class ExchangeService:
 
             # Extra debug for SELLs: log final prepared amount/quant/free before sending
             try:
-                if action.lower() == 'sell':
+                if side == 'sell':
                     logger.info(
                         "Final SELL amount prepared: amount=%s, quant=%s, free=%s",
                         amount, quant, free_dec if 'free_dec' in locals() else None,
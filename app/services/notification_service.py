@@ -26,8 +26,13 @@ class NotificationService:
     @staticmethod
     def is_enabled(user_id: int, notif_type: str) -> bool:
         try:
-            pref = UserNotificationPreference.query.filter_by(user_id=user_id, notif_type=notif_type).first()
-            return bool(pref and pref.enabled)
+            # Only the flag is needed; skip loading and tracking the whole row
+            enabled = (
+                db.session.query(UserNotificationPreference.enabled)
+                .filter_by(user_id=user_id, notif_type=notif_type)
+                .scalar()
+            )
+            return bool(enabled)
         except Exception as e:  # Table may not exist yet during migration window
             current_app.logger.debug(f"Notification prefs check failed (likely before migration): {e}")
             return False
@@ -71,16 +76,28 @@ class NotificationService:
         if not role:
             return
         admins = role.users
+        # Resolve opt-ins with one query rather than an is_enabled() lookup per admin
+        try:
+            opted_in = {
+                user_id for (user_id,) in db.session.query(UserNotificationPreference.user_id)
+                .filter_by(notif_type=ADMIN_NEW_USER_SIGNUP, enabled=True)
+            }
+        except Exception as e:  # Table may not exist yet during migration window
+            current_app.logger.debug(f"Notification prefs check failed (likely before migration): {e}")
+            return
+        if not opted_in:
+            return
+
+        subject = "Webhook App: New user sign-up"
+        preheader = f"{new_user_email} just created an account"
+        ctx = {
+            "new_user_email": new_user_email,
+            "current_year": datetime.utcnow().year,
+            "preheader": preheader,
+            "subject": subject,
+        }
         for admin in admins:
-            if NotificationService.is_enabled(admin.id, ADMIN_NEW_USER_SIGNUP):
-                subject = "Webhook App: New user sign-up"
-                preheader = f"{new_user_email} just created an account"
-                ctx = {
-                    "new_user_email": new_user_email,
-                    "current_year": datetime.utcnow().year,
-                    "preheader": preheader,
-                    "subject": subject,
-                }
+            if admin.id in opted_in:
                 NotificationService._send_email(
                     recipients=[admin.email],
                     subject=subject,
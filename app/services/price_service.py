@@ -7,16 +7,33 @@ API calls and staying well within CoinGecko's rate limits.
 
 from __future__ import annotations
 
+import heapq
 import logging
-from typing import Dict, Optional
-
+import math
+import threading
+import time
+from concurrent.futures import Future
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import msgspec
 import requests
+from requests.adapters import HTTPAdapter
+
+from app.exchanges.precision import FIAT_STABLES
+from app.utils.rate_limiter import TokenBucket
+from config import BACKGROUND_POOL_SIZE
 
 logger = logging.getLogger(__name__)
 
 _API_BASE = "https://api.coingecko.com/api/v3"
 _PRICE_TTL = 300  # seconds (5 minutes)
+_LOCAL_PRICE_TTL = 60.0  # seconds a worker trusts its own copy before re-reading the shared cache
 _CACHE_KEY_PREFIX = "price_usd_"
+_SYMBOL_MAP_KEY = "coingecko_symbol_map"
+_SYMBOL_MAP_TTL = 86_400  # seconds (24 hours)
+_BATCH_ATTEMPTS = 2
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
 
 
 class PriceService:
@@ -27,8 +44,8 @@ class PriceService:
     the same public interface and replace the internals.
     """
 
-    # Static fallback mapping for the most commonly traded symbols.
-    _STATIC_SYMBOL_MAP: Dict[str, str] = {
+    # Static fallback mapping for the most commonly traded symbols (read-only).
+    _STATIC_SYMBOL_MAP: Mapping[str, str] = MappingProxyType({
         "BTC": "bitcoin",
         "ETH": "ethereum",
         "LTC": "litecoin",
@@ -40,37 +57,123 @@ class PriceService:
         "DOT": "polkadot",
         "MATIC": "matic-network",
         "AVAX": "avalanche-2",
-    }
+    })
+
+    # One keep-alive session per process so successive CoinGecko calls reuse
+    # the TLS connection instead of paying a new handshake each time.
+    _session = requests.Session()
+    # requests keeps only 10 idle connections per host by default; concurrent
+    # valuations from the webhook background pool would overflow that and have
+    # their connections discarded, so size the pool to match
+    _session.mount("https://", HTTPAdapter(pool_maxsize=BACKGROUND_POOL_SIZE))
+
+    # CoinGecko's free tier allows roughly 50 calls per minute. The bucket is
+    # per process, so N workers together may spend up to N x 50 calls/min.
+    _rate_limiter = TokenBucket("coingecko", capacity=50, refill_per_second=50 / 60)
 
     # Symbol→CoinGecko-id map kept in-memory per process (just ID lookups, not prices)
-    _symbol_to_id: Dict[str, str] = _STATIC_SYMBOL_MAP.copy()
+    _symbol_to_id: Dict[str, str] = dict(_STATIC_SYMBOL_MAP)
+
+    # USD and USD-pegged stablecoins are valued at exactly $1; same set the
+    # exchange precision helpers treat as fiat-like.
+    _USD_STABLECOINS: frozenset[str] = frozenset(FIAT_STABLES)
+
+    # Per-process copy of recently seen prices: symbol -> (price, time.monotonic() stamp).
+    # Saves a FileSystemCache read (file open + unpickle) on hot paths. Stablecoins
+    # are pre-seeded with an infinite stamp so normal lookups never expire them;
+    # force_refresh skips the pin and asks CoinGecko.
+    _local_prices: Dict[str, Tuple[float, float]] = {
+        s: (1.0, math.inf) for s in _USD_STABLECOINS
+    }
+    # Min-heap of (expires_at, symbol) so expired copies can be dropped eagerly
+    _local_expiry: List[Tuple[float, str]] = []
+    _local_lock = threading.Lock()
+
+    # Pending single-symbol fetches so concurrent cache misses share one request
+    _inflight: Dict[str, Future] = {}
+    _inflight_lock = threading.Lock()
 
     @classmethod
     def _cache(cls):
         from app import cache
         return cache
 
+    @classmethod
+    def _get_local(cls, symbol: str, now: float, max_age: float = _LOCAL_PRICE_TTL) -> Optional[float]:
+        """Return the per-process price for *symbol* if younger than *max_age*.
+
+        ``max_age=0`` (force refresh) never matches, pinned stablecoins included.
+        """
+        entry = cls._local_prices.get(symbol)
+        if entry is not None and max_age > 0 and now - entry[1] < max_age:
+            return entry[0]
+        return None
+
+    @classmethod
+    def _set_local(cls, symbol: str, price: float) -> None:
+        if symbol in cls._USD_STABLECOINS:
+            # A forced refresh must not replace the pin with an expiring entry
+            return
+        now = time.monotonic()
+        with cls._local_lock:
+            cls._local_prices[symbol] = (price, now)
+            heapq.heappush(cls._local_expiry, (now + _LOCAL_PRICE_TTL, symbol))
+
+    @classmethod
+    def _sweep_local(cls, now: float) -> None:
+        """Drop expired per-process prices (amortised O(1) per call).
+
+        Heap entries left behind by a refreshed symbol are discarded without
+        touching the newer price.
+        """
+        heap = cls._local_expiry
+        with cls._local_lock:
+            while heap and heap[0][0] <= now:
+                _, symbol = heapq.heappop(heap)
+                entry = cls._local_prices.get(symbol)
+                if entry is not None and entry[1] + _LOCAL_PRICE_TTL <= now:
+                    del cls._local_prices[symbol]
+
     @classmethod
     def _load_symbol_map(cls) -> None:
-        """Populate the symbol→id map from CoinGecko (once per process)."""
+        """Populate the symbol→id map (once per process).
+
+        The fetched map is stored in the shared FileSystemCache so that
+        restarted processes and other Gunicorn workers skip the large
+        ``/coins/list`` download.
+        """
+        try:
+            cached = cls._cache().get(_SYMBOL_MAP_KEY)
+            if cached:
+                cls._symbol_to_id.update(cached)
+                logger.debug("Loaded %s coin symbols from shared cache", len(cached))
+                return
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Unable to read symbol map from cache: %s", exc)
+
         try:
             logger.debug("Fetching coin list from CoinGecko for symbol map …")
-            r = requests.get(f"{_API_BASE}/coins/list", timeout=20)
+            cls._rate_limiter.acquire()
+            r = cls._session.get(f"{_API_BASE}/coins/list", timeout=20)
             r.raise_for_status()
-            for coin in r.json():
-                symbol = coin["symbol"].upper()
-                if symbol not in cls._symbol_to_id:
-                    cls._symbol_to_id[symbol] = coin["id"]
+            # ~15k small dicts: msgspec decodes this several times faster than stdlib json
+            fetched: Dict[str, str] = {}
+            setdefault = fetched.setdefault
+            for coin in msgspec.json.decode(r.content):
+                setdefault(coin["symbol"].upper(), coin["id"])
+            # First listing per symbol wins; the static map overrides ambiguous tickers
+            cls._symbol_to_id = {**fetched, **cls._STATIC_SYMBOL_MAP}
             logger.info("Loaded %s coin symbols from CoinGecko", len(cls._symbol_to_id))
+            cls._cache().set(_SYMBOL_MAP_KEY, dict(cls._symbol_to_id), timeout=_SYMBOL_MAP_TTL)
         except Exception as exc:  # noqa: BLE001
             logger.error("Unable to fetch symbol map from CoinGecko: %s", exc, exc_info=True)
 
     @classmethod
     def _resolve_id(cls, symbol: str) -> Optional[str]:
-        """Return CoinGecko id for *symbol* (BTC -> bitcoin)."""
-        symbol = symbol.upper()
-        if symbol in cls._symbol_to_id:
-            return cls._symbol_to_id[symbol]
+        """Return CoinGecko id for an upper-cased *symbol* (BTC -> bitcoin)."""
+        coin_id = cls._symbol_to_id.get(symbol)
+        if coin_id:
+            return coin_id
         # Lazily load the full symbol map once per process if needed
         if len(cls._symbol_to_id) == len(cls._STATIC_SYMBOL_MAP):
             cls._load_symbol_map()
@@ -83,37 +186,73 @@ class PriceService:
         Results are cached in the shared FileSystemCache for 5 minutes so all
         Gunicorn workers benefit from a single fetch.
         """
-        symbol = symbol.upper()
+        if not symbol.isupper():
+            symbol = symbol.upper()
         cache = cls._cache()
         key = f"{_CACHE_KEY_PREFIX}{symbol}"
 
+        now = time.monotonic()
+        cls._sweep_local(now)
+        local = cls._get_local(symbol, now, 0.0 if force_refresh else _LOCAL_PRICE_TTL)
+        if local is not None:
+            return local
         if not force_refresh:
             cached = cache.get(key)
             if cached is not None and cached > 1e-4:
+                cls._set_local(symbol, cached)
                 return cached
 
         coin_id = cls._resolve_id(symbol)
         if not coin_id:
             raise ValueError(f"PriceService: Unknown symbol '{symbol}'.")
 
+        # Coalesce concurrent misses: the first caller fetches, the rest wait
+        # on its Future instead of issuing their own request.
+        with cls._inflight_lock:
+            pending = cls._inflight.get(symbol)
+            if pending is None:
+                future: Future = Future()
+                cls._inflight[symbol] = future
+        if pending is not None:
+            logger.debug("Awaiting in-flight price fetch for %s", symbol)
+            return pending.result()
+
         params = {"ids": coin_id, "vs_currencies": "usd"}
         try:
-            r = requests.get(f"{_API_BASE}/simple/price", params=params, timeout=15)
+            cls._rate_limiter.acquire()
+            r = cls._session.get(f"{_API_BASE}/simple/price", params=params, timeout=15)
             r.raise_for_status()
             price = float(r.json()[coin_id]["usd"])
             cache.set(key, price, timeout=_PRICE_TTL)
+            cls._set_local(symbol, price)
+            future.set_result(price)
             return price
         except Exception as exc:  # noqa: BLE001
             logger.error("Error fetching price for %s: %s", symbol, exc, exc_info=True)
+            future.set_exception(exc)
             raise
+        finally:
+            with cls._inflight_lock:
+                cls._inflight.pop(symbol, None)
 
     @classmethod
-    def get_prices_usd_batch(cls, symbols: list[str], *, force_refresh: bool = False) -> dict[str, float]:
+    def get_prices_usd_batch(
+        cls,
+        symbols: list[str],
+        *,
+        force_refresh: bool = False,
+        max_age: Optional[float] = None,
+    ) -> dict[str, float]:
         """Return USD prices for multiple symbols in a single CoinGecko API call.
 
         Checks the shared cache first; only fetches symbols whose price is
         missing or stale, keeping API usage minimal across all workers.
 
+        *max_age* bounds staleness in seconds: only prices this process stored
+        within that window are reused and the shared cache is skipped. Callers
+        that need near-live prices but may run back to back pass a short
+        window instead of ``force_refresh``.
+
         Returns:
             Dict mapping symbol -> USD price. Symbols whose price could not be
             fetched are omitted (callers should treat missing keys as unknown).
@@ -121,16 +260,29 @@ class PriceService:
         if not symbols:
             return {}
 
-        symbols = [s.upper() for s in symbols]
+        # Normalise once up front; everything below works on upper-cased symbols
+        symbols = [s if s.isupper() else s.upper() for s in symbols]
         cache = cls._cache()
         prices: dict[str, float] = {}
-        symbols_to_fetch: list[str] = []
+        now = time.monotonic()
+        cls._sweep_local(now)
 
+        symbols_to_fetch: list[str] = []
+        use_shared = not force_refresh and max_age is None
+        if max_age is None:
+            max_age = 0.0 if force_refresh else _LOCAL_PRICE_TTL
+        get_local = cls._get_local
+        cache_get = cache.get
         for symbol in symbols:
-            if not force_refresh:
-                cached = cache.get(f"{_CACHE_KEY_PREFIX}{symbol}")
+            local = get_local(symbol, now, max_age)
+            if local is not None:
+                prices[symbol] = local
+                continue
+            if use_shared:
+                cached = cache_get(_CACHE_KEY_PREFIX + symbol)
                 if cached is not None and cached > 1e-4:
                     prices[symbol] = cached
+                    cls._set_local(symbol, cached)
                     continue
             symbols_to_fetch.append(symbol)
 
@@ -140,8 +292,9 @@ class PriceService:
         # Resolve CoinGecko IDs for uncached symbols
         coin_ids: list[str] = []
         coin_id_to_symbol: dict[str, str] = {}
+        resolve_id = cls._resolve_id
         for symbol in symbols_to_fetch:
-            coin_id = cls._resolve_id(symbol)
+            coin_id = resolve_id(symbol)
             if coin_id:
                 coin_ids.append(coin_id)
                 coin_id_to_symbol[coin_id] = symbol
@@ -156,28 +309,36 @@ class PriceService:
             "vs_currencies": "usd",
         }
 
-        try:
-            logger.debug("Fetching batch prices for %d assets: %s", len(coin_ids), coin_ids)
-            r = requests.get(f"{_API_BASE}/simple/price", params=params, timeout=15)
-            r.raise_for_status()
-
-            for coin_id, data in r.json().items():
-                if "usd" in data:
-                    symbol = coin_id_to_symbol[coin_id]
-                    price = float(data["usd"])
-                    prices[symbol] = price
-                    cache.set(f"{_CACHE_KEY_PREFIX}{symbol}", price, timeout=_PRICE_TTL)
-                    logger.debug("Cached price for %s: $%s", symbol, price)
-
-            return prices
-
-        except Exception as exc:  # noqa: BLE001
-            logger.error("Batch price fetch failed for %s: %s", coin_ids, exc, exc_info=True)
-            # Fall back to individual fetches for any still-missing symbols
-            for symbol in symbols_to_fetch:
-                if symbol not in prices:
-                    try:
-                        prices[symbol] = cls.get_price_usd(symbol)
-                    except Exception:
-                        logger.warning("Failed individual fallback price fetch for %s", symbol)
-            return prices
+        for attempt in range(_BATCH_ATTEMPTS):
+            try:
+                logger.debug("Fetching batch prices for %d assets: %s", len(coin_ids), coin_ids)
+                cls._rate_limiter.acquire()
+                r = cls._session.get(f"{_API_BASE}/simple/price", params=params, timeout=15)
+                r.raise_for_status()
+                data_by_id = r.json()
+                break
+            except requests.HTTPError as exc:
+                status = exc.response.status_code if exc.response is not None else None
+                if status in _RETRYABLE_STATUS and attempt < _BATCH_ATTEMPTS - 1:
+                    wait = 0.5 * 2 ** attempt
+                    logger.warning("Batch price fetch got HTTP %s, retrying in %.1fs", status, wait)
+                    time.sleep(wait)
+                    continue
+                logger.error("Batch price fetch failed for %s: %s", coin_ids, exc, exc_info=True)
+                return prices
+            except Exception as exc:  # noqa: BLE001
+                logger.error("Batch price fetch failed for %s: %s", coin_ids, exc, exc_info=True)
+                return prices
+
+        # Symbols missing from the response are omitted; callers decide how to
+        # treat a partial result rather than us fanning out per-symbol calls.
+        for coin_id, data in data_by_id.items():
+            if "usd" in data and coin_id in coin_id_to_symbol:
+                symbol = coin_id_to_symbol[coin_id]
+                price = float(data["usd"])
+                prices[symbol] = price
+                cache.set(f"{_CACHE_KEY_PREFIX}{symbol}", price, timeout=_PRICE_TTL)
+                cls._set_local(symbol, price)
+                logger.debug("Cached price for %s: $%s", symbol, price)
+
+        return prices
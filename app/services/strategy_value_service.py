@@ -2,10 +2,12 @@
 from __future__ import annotations
 
 import logging
-from datetime import date, datetime
-from decimal import Decimal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import func
+from flask import current_app
+from sqlalchemy import func, insert, select
 
 from app import db
 from app.models.trading import StrategyValueHistory, TradingStrategy
@@ -13,236 +15,293 @@ from app.services.price_service import PriceService
 
 logger = logging.getLogger(__name__)
 
+# Snapshots need near-live prices, but runs triggered back to back (startup
+# catch-up, scheduled job, retries, bursts of webhook fills) may share one fetch
+_SNAPSHOT_PRICE_MAX_AGE = 30.0
 
-def _value_usd(strategy: TradingStrategy) -> Decimal:
-    """Calculate the current USD value for *strategy* using live prices."""
-    base_value = Decimal("0")
-    quote_value = Decimal("0")
-    calculated_values = False  # Track if we successfully calculated at least one asset value
-    
-    # Log the actual values for debugging
-    logger.info(
-        "Calculating value for strategy %s (%s): base=%s %s, quote=%s %s", 
-        strategy.id, strategy.name,
-        strategy.allocated_base_asset_quantity, strategy.base_asset_symbol,
-        strategy.allocated_quote_asset_quantity, strategy.quote_asset_symbol
-    )
-    
-    # Calculate base asset value if there's any quantity
-    if strategy.allocated_base_asset_quantity is not None and strategy.allocated_base_asset_quantity > 0:
-        try:
-            if not strategy.base_asset_symbol:
-                logger.error("Missing base asset symbol for strategy %s", strategy.id)
-            else:
-                base_px = Decimal(str(PriceService.get_price_usd(strategy.base_asset_symbol, force_refresh=True)))
-                base_value = Decimal(str(strategy.allocated_base_asset_quantity)) * base_px
-                logger.info("Base asset %s price: $%s, value: $%s", 
-                          strategy.base_asset_symbol, base_px, base_value)
-                calculated_values = True
-        except Exception as exc:  # noqa: BLE001
-            logger.error("Could not calculate base asset value for %s: %s", 
-                        strategy.base_asset_symbol, exc)
-    
-    # Calculate quote asset value if there's any quantity
-    if strategy.allocated_quote_asset_quantity is not None and strategy.allocated_quote_asset_quantity > 0:
-        try:
-            if not strategy.quote_asset_symbol:
-                logger.error("Missing quote asset symbol for strategy %s", strategy.id)
-            else:
-                quote_px = Decimal(str(PriceService.get_price_usd(strategy.quote_asset_symbol, force_refresh=True)))
-                quote_value = Decimal(str(strategy.allocated_quote_asset_quantity)) * quote_px
-                logger.info("Quote asset %s price: $%s, value: $%s", 
-                           strategy.quote_asset_symbol, quote_px, quote_value)
-                calculated_values = True
-        except Exception as exc:  # noqa: BLE001
-            logger.error("Could not calculate quote asset value for %s: %s", 
-                        strategy.quote_asset_symbol, exc)
-
-    # Calculate total value
-    val = base_value + quote_value
-    formatted_val = val.quantize(Decimal("0.01"))
-    logger.info("Total value for strategy %s: $%s (calculated_values=%s)", 
-               strategy.id, formatted_val, calculated_values)
-    
-    return formatted_val
 
+def _fetch_prices_for(*strategies: TradingStrategy) -> dict[str, float]:
+    """Fetch live prices for the held base/quote symbols of *strategies* in one batch call.
+
+    Sides with no allocation are not priced, so dormant strategies cost no
+    request at all. A failed fetch is logged and yields an empty dict, so
+    valuation treats the affected assets as unpriced.
+    """
+    symbols = {
+        symbol
+        for strategy in strategies
+        for symbol, qty in (
+            (strategy.base_asset_symbol, strategy.allocated_base_asset_quantity),
+            (strategy.quote_asset_symbol, strategy.allocated_quote_asset_quantity),
+        )
+        if symbol and (qty or 0) > 0
+    }
+    if not symbols:
+        return {}
+    try:
+        return PriceService.get_prices_usd_batch(sorted(symbols), max_age=_SNAPSHOT_PRICE_MAX_AGE)
+    except Exception as exc:  # noqa: BLE001
+        logger.error(
+            "Could not fetch prices for strategies %s: %s",
+            [strategy.id for strategy in strategies], exc,
+        )
+        return {}
+
+
+def _value_usd(strategy: TradingStrategy) -> float:
+    """Calculate the current USD value for *strategy* using live prices.
+
+    Fetches the base and quote prices with one batched call and delegates the
+    maths to :func:`_value_usd_with_prices`.
+    """
+    return _value_usd_with_prices(strategy, _fetch_prices_for(strategy))
 
-def _value_usd_with_prices(strategy: TradingStrategy, asset_prices: dict[str, float]) -> Decimal:
+
+def _value_usd_with_prices(strategy: TradingStrategy, asset_prices: dict[str, float]) -> float:
     """Calculate the current USD value for *strategy* using pre-fetched prices.
-    
-    This is more efficient than _value_usd() as it uses batched price data
-    instead of making individual API calls for each strategy.
+
+    *asset_prices* maps upper-cased symbols to USD prices; assets without a
+    price contribute nothing to the total. The sum is computed in float and
+    rounded to cents once at the end.
     """
-    base_value = Decimal("0")
-    quote_value = Decimal("0")
-    calculated_values = False
-    
+    val = 0.0
+
     # Log the actual values for debugging
-    logger.info(
+    logger.debug(
         "Calculating value for strategy %s (%s): base=%s %s, quote=%s %s",
         strategy.id, strategy.name,
         strategy.allocated_base_asset_quantity, strategy.base_asset_symbol,
         strategy.allocated_quote_asset_quantity, strategy.quote_asset_symbol
     )
-    
+
     # Calculate base asset value if there's any quantity
-    if (strategy.allocated_base_asset_quantity is not None and 
-            strategy.allocated_base_asset_quantity > 0 and 
-            strategy.base_asset_symbol):
-        symbol = strategy.base_asset_symbol.upper()
-        if symbol in asset_prices:
-            base_px = Decimal(str(asset_prices[symbol]))
-            base_value = Decimal(str(strategy.allocated_base_asset_quantity)) * base_px
-            logger.info("Base asset %s price: $%s, value: $%s", symbol, base_px, base_value)
-            calculated_values = True
+    base_qty = strategy.allocated_base_asset_quantity
+    if base_qty is not None and base_qty > 0 and strategy.base_asset_symbol:
+        symbol = strategy.base_asset_symbol
+        if not symbol.isupper():
+            symbol = symbol.upper()
+        base_px = asset_prices.get(symbol)
+        if base_px is not None:
+            base_value = float(base_qty) * float(base_px)
+            logger.debug("Base asset %s price: $%s, value: $%s", symbol, base_px, base_value)
+            val += base_value
         else:
             logger.warning("No price available for base asset %s", symbol)
-    
+
     # Calculate quote asset value if there's any quantity
-    if (strategy.allocated_quote_asset_quantity is not None and 
-            strategy.allocated_quote_asset_quantity > 0 and 
-            strategy.quote_asset_symbol):
-        symbol = strategy.quote_asset_symbol.upper()
-        if symbol in asset_prices:
-            quote_px = Decimal(str(asset_prices[symbol]))
-            quote_value = Decimal(str(strategy.allocated_quote_asset_quantity)) * quote_px
-            logger.info("Quote asset %s price: $%s, value: $%s", symbol, quote_px, quote_value)
-            calculated_values = True
+    quote_qty = strategy.allocated_quote_asset_quantity
+    if quote_qty is not None and quote_qty > 0 and strategy.quote_asset_symbol:
+        symbol = strategy.quote_asset_symbol
+        if not symbol.isupper():
+            symbol = symbol.upper()
+        quote_px = asset_prices.get(symbol)
+        if quote_px is not None:
+            quote_value = float(quote_qty) * float(quote_px)
+            logger.debug("Quote asset %s price: $%s, value: $%s", symbol, quote_px, quote_value)
+            val += quote_value
         else:
             logger.warning("No price available for quote asset %s", symbol)
 
-    # Calculate total value
-    val = base_value + quote_value
-    formatted_val = val.quantize(Decimal("0.01"))
-    logger.info("Total value for strategy %s: $%s (calculated_values=%s)",
-                strategy.id, formatted_val, calculated_values)
-    
+    formatted_val = round(val, 2)
+    logger.debug("Total value for strategy %s: $%s", strategy.id, formatted_val)
+
     return formatted_val
 
 
-def snapshot_all_strategies(*, source: str = "unspecified", max_retries: int = 3) -> None:
+def _fetch_snapshot_prices(app, symbols: list[str]) -> dict[str, float]:
+    """Fetch snapshot prices on a worker thread with its own app context."""
+    with app.app_context():
+        return PriceService.get_prices_usd_batch(symbols, max_age=_SNAPSHOT_PRICE_MAX_AGE)
+
+
+def _release_stream(result) -> None:
+    """Close a streamed *result* and end the read transaction so its connection returns to the pool."""
+    result.close()
+    db.session.rollback()
+
+
+def _run_scheduled_retry(source: str, max_retries: int, attempt: int) -> None:
+    """APScheduler entry point for a re-queued snapshot attempt."""
+    from app import scheduler
+
+    with scheduler.app.app_context():
+        snapshot_all_strategies(source=source, max_retries=max_retries, attempt=attempt)
+
+
+def _retry_snapshot(*, source: str, max_retries: int, attempt: int, delay_seconds: int) -> None:
+    """Re-run the snapshot after *delay_seconds* without holding the current thread.
+
+    When the APScheduler instance is running the retry is queued as a one-off
+    job so the worker is released immediately; otherwise (CLI, tests) it falls
+    back to sleeping inline.
+    """
+    from app import scheduler
+
+    if scheduler.running:
+        scheduler.add_job(
+            id=f"strategy_snapshot_retry_{attempt}",
+            func=_run_scheduled_retry,
+            args=[source, max_retries, attempt],
+            trigger="date",
+            run_date=datetime.now() + timedelta(seconds=delay_seconds),
+            replace_existing=True,
+            misfire_grace_time=3600,
+        )
+        logger.info("Scheduled snapshot retry %d/%d in %d seconds", attempt + 1, max_retries, delay_seconds)
+        return
+
+    logger.info(f"Retrying in {delay_seconds} seconds...")
+    time.sleep(delay_seconds)
+    snapshot_all_strategies(source=source, max_retries=max_retries, attempt=attempt)
+
+
+def snapshot_all_strategies(*, source: str = "unspecified", max_retries: int = 3, attempt: int = 0) -> None:
     """Create or update today's value snapshot for every strategy.
     
     Args:
         source: Source of the snapshot request (e.g., "scheduled_daily", "manual")
-        max_retries: Maximum number of retry attempts if price fetching fails
+        max_retries: Maximum number of attempts if price fetching fails
+        attempt: Zero-based attempt number; set by re-queued retries
     """
-    import time
-    
     logger.info("Running strategy value snapshot (source=%s) …", source)
-    today = date.today()
+    # One clock read for the whole run: every row shares this timestamp and
+    # "today" is derived from it, so a run straddling midnight stays consistent.
+    # Timestamps are stored as naive UTC, hence the tzinfo strip.
+    snapshot_ts = datetime.now(timezone.utc).replace(tzinfo=None)
+    today = snapshot_ts.date()
+    # Half-open [today, tomorrow) range so the timestamp index can be used
+    day_start = datetime.combine(today, datetime.min.time())
+    day_end = day_start + timedelta(days=1)
 
-    strategies = TradingStrategy.query.all()
-    if not strategies:
-        logger.info("No strategies found, skipping snapshot")
-        return
-
-    # Collect all unique assets needed for pricing
-    required_assets = set()
-    for strat in strategies:
-        if (strat.allocated_base_asset_quantity is not None and
-                strat.allocated_base_asset_quantity > 0 and
-                strat.base_asset_symbol):
-            required_assets.add(strat.base_asset_symbol.upper())
-        if (strat.allocated_quote_asset_quantity is not None and
-                strat.allocated_quote_asset_quantity > 0 and
-                strat.quote_asset_symbol):
-            required_assets.add(strat.quote_asset_symbol.upper())
+    # Unique symbols with a positive allocation on either side, resolved by the DB
+    base_assets = db.session.query(func.upper(TradingStrategy.base_asset_symbol)).filter(
+        TradingStrategy.allocated_base_asset_quantity > 0,
+        TradingStrategy.base_asset_symbol.isnot(None),
+        TradingStrategy.base_asset_symbol != "",
+    )
+    quote_assets = db.session.query(func.upper(TradingStrategy.quote_asset_symbol)).filter(
+        TradingStrategy.allocated_quote_asset_quantity > 0,
+        TradingStrategy.quote_asset_symbol.isnot(None),
+        TradingStrategy.quote_asset_symbol != "",
+    )
+    required_assets = {symbol for (symbol,) in base_assets.union(quote_assets).all()}
 
     if not required_assets:
         logger.info("No assets to price, skipping snapshot")
         return
 
-    # Retry logic for price fetching with exponential backoff
+    logger.info(
+        "Fetching prices for %d unique assets (attempt %d/%d): %s",
+        len(required_assets), attempt + 1, max_retries, sorted(required_assets),
+    )
+    # Start the price request first so it overlaps with loading the strategy rows
+    app = current_app._get_current_object()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        price_future = executor.submit(_fetch_snapshot_prices, app, list(required_assets))
+
+        # Only the columns valuation needs; rows expose them as attributes like the
+        # model. Rows are streamed in batches instead of materialising the whole
+        # table; execute() issues the query now so it still overlaps the fetch.
+        strategies = db.session.execute(
+            select(
+                TradingStrategy.id,
+                TradingStrategy.name,
+                TradingStrategy.allocated_base_asset_quantity,
+                TradingStrategy.base_asset_symbol,
+                TradingStrategy.allocated_quote_asset_quantity,
+                TradingStrategy.quote_asset_symbol,
+            ).execution_options(yield_per=500)
+        )
+
+    # Price fetch; on failure the retry is re-queued with exponential backoff
     asset_prices = None
-    for attempt in range(max_retries):
-        try:
-            logger.info(f"Fetching prices for {len(required_assets)} unique assets (attempt {attempt + 1}/{max_retries}): {sorted(required_assets)}")
-            asset_prices = PriceService.get_prices_usd_batch(list(required_assets), force_refresh=True)
-            
-            # Validate that we got prices for the critical assets
-            missing_prices = required_assets - set(asset_prices.keys())
-            if missing_prices:
-                logger.warning(f"Missing prices for {len(missing_prices)} assets: {sorted(missing_prices)}")
-                # If we're missing more than 50% of required prices, consider this a failure
-                if len(missing_prices) > len(required_assets) * 0.5:
-                    raise ValueError(f"Too many missing prices: {len(missing_prices)}/{len(required_assets)}")
-            
-            logger.info(f"Successfully fetched {len(asset_prices)} asset prices")
-            break  # Success, exit retry loop
-            
-        except Exception as exc:
-            logger.error(f"Price fetch attempt {attempt + 1} failed: %s", exc, exc_info=True)
-            if attempt < max_retries - 1:
-                # Exponential backoff: 30s, 60s, 120s
-                wait_time = 30 * (2 ** attempt)
-                logger.info(f"Retrying in {wait_time} seconds...")
-                time.sleep(wait_time)
-            else:
-                logger.error("All price fetch attempts failed. Aborting snapshot to prevent recording 0 values.")
-                return  # Exit completely - do not record any values
+    try:
+        asset_prices = price_future.result()
+
+        # Validate that we got prices for the critical assets
+        missing_prices = required_assets - set(asset_prices.keys())
+        if missing_prices:
+            logger.warning(f"Missing prices for {len(missing_prices)} assets: {sorted(missing_prices)}")
+            # If we're missing more than 50% of required prices, consider this a failure
+            if len(missing_prices) > len(required_assets) * 0.5:
+                raise ValueError(f"Too many missing prices: {len(missing_prices)}/{len(required_assets)}")
+
+        logger.info(f"Successfully fetched {len(asset_prices)} asset prices")
+
+    except Exception as exc:
+        logger.error(f"Price fetch attempt {attempt + 1} failed: %s", exc, exc_info=True)
+        # Release the open cursor and its pooled connection before any backoff wait
+        _release_stream(strategies)
+        if attempt < max_retries - 1:
+            # Exponential backoff: 30s, 60s, 120s
+            _retry_snapshot(source=source, max_retries=max_retries, attempt=attempt + 1,
+                            delay_seconds=30 * (2 ** attempt))
+        else:
+            logger.error("All price fetch attempts failed. Aborting snapshot to prevent recording 0 values.")
+        return  # Do not record any values from this attempt
 
     # Double-check we have valid prices before proceeding
     if not asset_prices:
         logger.error("No asset prices available. Aborting snapshot to prevent recording 0 values.")
+        _release_stream(strategies)
         return
 
     # Calculate values for all strategies using the batched prices
     successful_snapshots = 0
     failed_snapshots = 0
-    
+    snapshot_rows: list[dict] = []
+
     for strat in strategies:
+        strat_id = strat.id
+        qb, qq = strat.allocated_base_asset_quantity, strat.allocated_quote_asset_quantity
         try:
             current_val = _value_usd_with_prices(strat, asset_prices)
             
             # Critical check: Never record 0 values unless the strategy actually has 0 assets
-            has_assets = ((strat.allocated_base_asset_quantity or 0) > 0 or 
-                         (strat.allocated_quote_asset_quantity or 0) > 0)
+            has_assets = (qb or 0) > 0 or (qq or 0) > 0
             
             if current_val == 0 and has_assets:
-                logger.error(f"Strategy {strat.id} ({strat.name}) calculated as $0 but has assets. Skipping to prevent bad data.")
+                logger.error("Strategy %s (%s) calculated as $0 but has assets. Skipping to prevent bad data.",
+                             strat_id, strat.name)
                 failed_snapshots += 1
                 continue
                 
         except Exception as exc:
-            logger.error("Failed to calculate value for strategy %s: %s", strat.id, exc, exc_info=True)
+            logger.error("Failed to calculate value for strategy %s: %s", strat_id, exc, exc_info=True)
             failed_snapshots += 1
             continue
 
-        try:
-            # Delete all existing records for this strategy on this date to ensure clean state
-            # This handles the case where multiple concurrent workers created duplicate records
-            deleted_count = StrategyValueHistory.query.filter(
-                StrategyValueHistory.strategy_id == strat.id,
-                func.date(StrategyValueHistory.timestamp) == today
-            ).delete()
-            
-            if deleted_count > 0:
-                logger.info(f"Deleted {deleted_count} existing snapshot(s) for strategy {strat.id}")
-            
-            # Create a fresh record with the current calculated value
-            db.session.add(
-                StrategyValueHistory(
-                    strategy_id=strat.id,
-                    timestamp=datetime.utcnow(),
-                    value_usd=current_val,
-                    base_asset_quantity_snapshot=strat.allocated_base_asset_quantity,
-                    quote_asset_quantity_snapshot=strat.allocated_quote_asset_quantity,
-                )
-            )
-            successful_snapshots += 1
-            logger.info(f"Prepared snapshot for strategy {strat.id} ({strat.name}): ${current_val}")
-            
-        except Exception as exc:
-            logger.error(f"Failed to prepare snapshot for strategy {strat.id}: %s", exc, exc_info=True)
-            failed_snapshots += 1
-            continue
+        # Queue a fresh record; today's old rows are replaced in bulk below
+        snapshot_rows.append({
+            "strategy_id": strat_id,
+            "timestamp": snapshot_ts,
+            "value_usd": current_val,
+            "base_asset_quantity_snapshot": qb,
+            "quote_asset_quantity_snapshot": qq,
+        })
+        successful_snapshots += 1
+        logger.debug("Prepared snapshot for strategy %s (%s): $%s", strat_id, strat.name, current_val)
     
     # Only commit if we have at least some successful snapshots
     if successful_snapshots > 0:
         try:
+            # Delete today's existing records for the strategies being written to ensure
+            # clean state (concurrent workers may have created duplicates), in one statement
+            replace_ids = [row["strategy_id"] for row in snapshot_rows]
+            deleted_count = StrategyValueHistory.query.filter(
+                StrategyValueHistory.strategy_id.in_(replace_ids),
+                StrategyValueHistory.timestamp >= day_start,
+                StrategyValueHistory.timestamp < day_end,
+            ).delete(synchronize_session=False)
+            logger.debug("Deleted %d existing snapshot(s) for %d strategies", deleted_count, len(replace_ids))
+
+            # Single executemany INSERT instead of one unit-of-work flush per row
+            db.session.execute(insert(StrategyValueHistory), snapshot_rows)
             db.session.commit()
-            logger.info(f"Successfully committed {successful_snapshots} strategy snapshots. Failed: {failed_snapshots}")
+            logger.info(
+                "snapshot: %d ok, %d failed, %d assets",
+                successful_snapshots, failed_snapshots, len(required_assets),
+            )
         except Exception as exc:
             logger.error("Failed to commit strategy value snapshots: %s", exc, exc_info=True)
             db.session.rollback()
@@ -250,4 +309,3 @@ def snapshot_all_strategies(*, source: str = "unspecified", max_retries: int = 3
     else:
         logger.error(f"No successful snapshots to commit. All {failed_snapshots} strategies failed.")
         db.session.rollback()
-        db.session.rollback()
@@ -2,18 +2,26 @@
 import json
 import uuid
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from decimal import Decimal, ROUND_DOWN
 from typing import Dict, Any
 
+from sqlalchemy.orm import joinedload
+
 from app import db
 from app.models import TradingStrategy, Automation, WebhookLog
 from app.services.exchange_service import ExchangeService
 from app.services.notification_service import NotificationService
 from app.exchanges.registry import ExchangeRegistry
+from config import BACKGROUND_POOL_SIZE
 
 logger = logging.getLogger(__name__)
 
+# Bounded pool for deferred trades and snapshots so an alert storm queues work
+# instead of spawning one OS thread per webhook
+_background_executor = ThreadPoolExecutor(max_workers=BACKGROUND_POOL_SIZE, thread_name_prefix="webhook-bg")
+
 
 class EnhancedWebhookProcessor:
     """
@@ -31,9 +39,13 @@ class EnhancedWebhookProcessor:
         """
         self.identifier = identifier
         logger.info(f"Received webhook for identifier: {identifier}")
-        logger.info(f"Webhook Payload:\n{json.dumps(payload, indent=2)}")
 
-        strategy = TradingStrategy.query.filter_by(webhook_id=identifier).first()
+        # Credentials are needed on every accepted webhook; load them in the same query
+        strategy = (
+            TradingStrategy.query.options(joinedload(TradingStrategy.exchange_credential))
+            .filter_by(webhook_id=identifier)
+            .first()
+        )
         if strategy:
             logger.info(
                 f"Identifier matched to Trading Strategy ID: {strategy.id} "
@@ -55,7 +67,7 @@ class EnhancedWebhookProcessor:
         webhooks so they get a fast response.
         """
         logger.info(f"Processing webhook for strategy {strategy.id} (name: {strategy.name})")
-        logger.info(f"Webhook Payload:\n{json.dumps(payload, indent=2)}")
+        logger.debug("Webhook Payload: %s", payload)
 
         # If the strategy is paused/inactive, ignore the webhook gracefully
         if not strategy.is_active:
@@ -133,7 +145,7 @@ class EnhancedWebhookProcessor:
     def _process_for_automation(self, automation: Automation, payload: Dict[str, Any]):
         """Processes a webhook for an Automation (legacy)."""
         logger.info(f"Processing webhook for automation {automation.id} (name: {automation.name})")
-        logger.info(f"Webhook Payload:\n{json.dumps(payload, indent=2)}")
+        logger.debug("Webhook Payload: %s", payload)
         
         try:
             action = payload['action']
@@ -157,18 +169,12 @@ class EnhancedWebhookProcessor:
         return self._process_for_strategy(strategy, payload)
 
     def _defer_trade_execution(self, params: dict):
-        """Spawn a background thread to execute the trade so the HTTP response
+        """Queue the trade on the background pool so the HTTP response
         can be returned to TradingView immediately after validation."""
-        from threading import Thread
         from flask import current_app
 
         app = current_app._get_current_object()
-        thread = Thread(
-            target=self._execute_trade_with_context,
-            args=(app, params),
-            daemon=True,
-        )
-        thread.start()
+        _background_executor.submit(self._execute_trade_with_context, app, params)
 
     def _execute_trade_with_context(self, app, params: dict):
         """Run inside a background thread with a fresh Flask app context.
@@ -178,7 +184,11 @@ class EnhancedWebhookProcessor:
         """
         with app.app_context():
             try:
-                strategy = TradingStrategy.query.get(params['strategy_id'])
+                strategy = db.session.get(
+                    TradingStrategy,
+                    params['strategy_id'],
+                    options=[joinedload(TradingStrategy.exchange_credential)],
+                )
                 if not strategy:
                     logger.error(
                         "Background trade: strategy %s not found", params['strategy_id']
@@ -317,7 +327,14 @@ class EnhancedWebhookProcessor:
         elif isinstance(obj, list):
             return [self._serialize_decimal(item) for item in obj]
         return obj
-            
+
+    @staticmethod
+    def _json_default(obj):
+        """``json.dumps`` fallback that encodes Decimal as float."""
+        if isinstance(obj, Decimal):
+            return float(obj)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
     def _log_and_commit(
         self,
         strategy_id=None,
@@ -333,22 +350,26 @@ class EnhancedWebhookProcessor:
     ):
         """Log webhook event and commit to database."""
         try:
-            # First log the original payload for debugging
-            logger.info(f"DEBUG - Before serialization - Payload type: {type(payload)}, Content: {payload}")
-            
-            # Convert any Decimal objects in payload and trade_result to float
+            # First log the original payload for debugging (formatted only when enabled)
+            logger.debug("Before serialization - Payload type: %s, Content: %s", type(payload), payload)
+
+            # payload is a JSON column: hand it the structure and let the dialect
+            # encode it once (pre-dumping stored a JSON string inside JSON, which
+            # every read then had to decode twice). Older rows hold such strings,
+            # which WebhookLog.to_dict still accepts.
             payload_to_store = self._serialize_decimal(payload)
-            trade_result_to_store = self._serialize_decimal(trade_result)
 
-            # Convert dictionaries to JSON strings for database storage
-            if payload_to_store and isinstance(payload_to_store, dict):
-                payload_to_store = json.dumps(payload_to_store)
+            # raw_response is Text: dicts are dumped to JSON here, with Decimals
+            # encoded as floats during the same pass
+            if trade_result and isinstance(trade_result, dict):
+                trade_result_to_store = json.dumps(trade_result, default=self._json_default)
+            else:
+                trade_result_to_store = self._serialize_decimal(trade_result)
 
-            if trade_result_to_store and isinstance(trade_result_to_store, dict):
-                trade_result_to_store = json.dumps(trade_result_to_store)
-                
-            # Log the serialized data types before database storage
-            logger.info(f"DEBUG - Before WebhookLog creation - Storing payload type: {type(payload_to_store)}, trade_result type: {type(trade_result_to_store)}")
+            logger.debug(
+                "Before WebhookLog creation - Storing payload type: %s, trade_result type: %s",
+                type(payload_to_store), type(trade_result_to_store),
+            )
             
             # Look up strategy and exchange names if strategy_id is provided
             strategy_name = "Unknown"
@@ -357,15 +378,15 @@ class EnhancedWebhookProcessor:
             if strategy_id:
                 # Try to find the strategy and get its name and exchange
                 try:
-                    from app.models.trading import TradingStrategy
-                    from app.models.exchange_credentials import ExchangeCredentials
-                    strategy = TradingStrategy.query.get(strategy_id)
+                    # The caller has usually loaded the strategy with its credentials
+                    # already, so both come from the identity map without a query
+                    strategy = db.session.get(TradingStrategy, strategy_id)
                     if strategy:
                         strategy_name = strategy.name
-                        
+
                         # Get the exchange name from the exchange credentials
                         if strategy.exchange_credential_id:
-                            exchange_credential = ExchangeCredentials.query.get(strategy.exchange_credential_id)
+                            exchange_credential = strategy.exchange_credential
                             if exchange_credential:
                                 exchange_name = exchange_credential.exchange
                                 # Replace user-unfriendly adapter suffix e.g. 'coinbase-ccxt' → 'coinbase'
@@ -379,7 +400,7 @@ class EnhancedWebhookProcessor:
                 strategy_id=strategy_id,
                 automation_id=automation_id,
                 target_type=target_type,
-                payload=payload_to_store,  # Now this should be a JSON string if it was a dict
+                payload=payload_to_store,  # Native dict/list; the JSON column encodes it
                 trading_pair=trading_pair,
                 status=status,
                 message=message,
@@ -393,8 +414,10 @@ class EnhancedWebhookProcessor:
             )
             db.session.add(webhook_log)
             
-            # Log the values after creating the WebhookLog
-            logger.info(f"DEBUG - After WebhookLog creation - Log payload attribute type: {type(webhook_log.payload)}, Content: {webhook_log.payload}")
+            logger.debug(
+                "After WebhookLog creation - Log payload attribute type: %s, Content: %s",
+                type(webhook_log.payload), webhook_log.payload,
+            )
             
             db.session.commit()
             identifier = self.identifier or (strategy_id or automation_id)
@@ -788,7 +811,8 @@ class EnhancedWebhookProcessor:
             return
 
         try:
-            balances = client.fetch_balance()
+            with ExchangeService.client_lock(strategy.user_id, exchange, portfolio_name):
+                balances = client.fetch_balance()
         except Exception as exc:
             logger.warning(
                 "Drift check: fetch_balance failed for user %s exchange %s – %s",
@@ -825,18 +849,12 @@ class EnhancedWebhookProcessor:
                 )
 
     def _defer_snapshot_creation(self, strategy: TradingStrategy):
-        """Create a strategy value snapshot in a background thread to avoid blocking webhook response."""
+        """Create a strategy value snapshot on the background pool to avoid blocking webhook response."""
         try:
-            from threading import Thread
             from flask import current_app
 
             app = current_app._get_current_object()
-            thread = Thread(
-                target=self._create_snapshot_with_context,
-                args=(app, strategy.id),
-                daemon=True
-            )
-            thread.start()
+            _background_executor.submit(self._create_snapshot_with_context, app, strategy.id)
         except Exception as e:
             logger.error(f"Failed to defer snapshot creation: {e}")
 
@@ -0,0 +1,51 @@
+# app/utils/rate_limiter.py
+
+import time
+import logging
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Token-bucket limiter that paces outbound calls to a rate-limited API
+    instead of bursting into HTTP 429 responses.
+
+    State lives in memory, so the limit applies per process: with N Gunicorn
+    workers the effective budget against the remote API is N times the rate.
+    """
+
+    def __init__(self, name, capacity=50, refill_per_second=50 / 60):
+        """
+        Initialize a token bucket
+
+        Args:
+            name (str): Name for this bucket (used in log messages)
+            capacity (float): Maximum burst size in calls
+            refill_per_second (float): Sustained call rate
+        """
+        self.name = name
+        self.capacity = float(capacity)
+        self.rate = float(refill_per_second)
+
+        # Start full so a cold process can burst immediately
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self._bucket_lock = Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available"""
+        with self._bucket_lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+
+            if self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+                logger.info("Rate limiter '%s' throttling for %.2fs", self.name, wait)
+                # Sleep while holding the lock so waiting callers queue in order
+                time.sleep(wait)
+                self.tokens = 1.0
+                self.last = time.monotonic()
+
+            self.tokens -= 1
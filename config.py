@@ -9,6 +9,10 @@ load_dotenv()
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
+# Worker count of the webhook background executor; PriceService sizes its HTTP
+# connection pool to match. Module-level because both are built at import time.
+BACKGROUND_POOL_SIZE = 32
+
 
 class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
@@ -17,7 +21,9 @@ class Config:
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_pre_ping': True,  # Enables automatic reconnection
         'pool_recycle': 300,    # Recycle connections every 5 minutes
-        'pool_size': 10         # Maximum number of connections to keep
+        'pool_size': 10,        # Maximum number of connections to keep
+        'max_overflow': 20,     # Extra connections allowed during bursts
+        'pool_use_lifo': True   # Reuse the warmest connection; idle overflow can time out
     }
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
@@ -0,0 +1,30 @@
+"""Add (strategy_id, timestamp) index to webhook_logs
+
+Revision ID: a9c3e5f70b14
+Revises: f4b8c2d61e37
+Create Date: 2026-10-18 13:24:09.771350
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9c3e5f70b14'
+down_revision = 'f4b8c2d61e37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('webhook_logs', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_webhook_logs_strategy_timestamp',
+            ['strategy_id', 'timestamp'],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('webhook_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_webhook_logs_strategy_timestamp')
@@ -0,0 +1,30 @@
+"""Add composite lookup index to exchange_credentials
+
+Revision ID: c41e7a92d3b5
+Revises: b5ba8dda8072
+Create Date: 2026-10-18 09:12:41.305118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41e7a92d3b5'
+down_revision = 'b5ba8dda8072'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('exchange_credentials', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_exchange_credentials_user_exchange',
+            ['user_id', 'exchange'],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('exchange_credentials', schema=None) as batch_op:
+        batch_op.drop_index('ix_exchange_credentials_user_exchange')
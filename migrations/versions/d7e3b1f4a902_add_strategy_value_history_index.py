@@ -0,0 +1,30 @@
+"""Add (strategy_id, timestamp) index to strategy_value_history
+
+Revision ID: d7e3b1f4a902
+Revises: c41e7a92d3b5
+Create Date: 2026-10-18 11:04:27.518263
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7e3b1f4a902'
+down_revision = 'c41e7a92d3b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('strategy_value_history', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_strategy_value_history_strategy_timestamp',
+            ['strategy_id', 'timestamp'],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('strategy_value_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_strategy_value_history_strategy_timestamp')
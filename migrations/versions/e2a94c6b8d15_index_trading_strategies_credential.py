@@ -0,0 +1,26 @@
+"""Index trading_strategies.exchange_credential_id
+
+Revision ID: e2a94c6b8d15
+Revises: d7e3b1f4a902
+Create Date: 2026-10-18 11:37:52.904416
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a94c6b8d15'
+down_revision = 'd7e3b1f4a902'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('trading_strategies', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_trading_strategies_exchange_credential_id'), ['exchange_credential_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('trading_strategies', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_trading_strategies_exchange_credential_id'))
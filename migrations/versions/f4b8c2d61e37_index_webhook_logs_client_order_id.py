@@ -0,0 +1,26 @@
+"""Index webhook_logs.client_order_id
+
+Revision ID: f4b8c2d61e37
+Revises: e2a94c6b8d15
+Create Date: 2026-10-18 13:05:41.217903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4b8c2d61e37'
+down_revision = 'e2a94c6b8d15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('webhook_logs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_webhook_logs_client_order_id'), ['client_order_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('webhook_logs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_webhook_logs_client_order_id'))
@@ -1,6 +1,11 @@
 """Tests for CCXT adapter methods (app/exchanges/ccxt_base_adapter.py)."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from unittest.mock import Mock, patch
+from app.exchanges import ccxt_base_adapter
 from app.exchanges.ccxt_base_adapter import CcxtBaseAdapter
 from app.exchanges.registry import ExchangeRegistry
 from app import db
@@ -9,6 +14,14 @@ from app.models.exchange_credentials import ExchangeCredentials
 from flask_security.utils import hash_password
 
 
+@pytest.fixture(autouse=True)
+def _clear_live_clients():
+    """Keep per-process ccxt clients from leaking between tests."""
+    ccxt_base_adapter._live_clients.clear()
+    yield
+    ccxt_base_adapter._live_clients.clear()
+
+
 @pytest.fixture
 def mock_ccxt_exchange():
     """Create a mock CCXT exchange."""
@@ -145,6 +158,79 @@ class TestCcxtBaseAdapterGetClient:
             client = adapter_cls.get_client(user_id)
             assert client is None
 
+    def test_get_client_memoised_in_process(self, app):
+        """get_client should reuse the live client across app contexts."""
+        adapter_cls = ExchangeRegistry.get_adapter('kraken')
+        fake_client = Mock()
+        with patch.object(adapter_cls, '_get_cached_client', return_value=fake_client) as mock_get:
+            with app.app_context():
+                assert adapter_cls.get_client(1) is fake_client
+            with app.app_context():
+                assert adapter_cls.get_client(1) is fake_client
+            assert mock_get.call_count == 1
+
+    def test_get_client_evicts_expired_clients(self, app):
+        """Building a client should drop other users' expired live clients."""
+        adapter_cls = ExchangeRegistry.get_adapter('kraken')
+        stale_key = ccxt_base_adapter._make_key_ccxt_client(adapter_cls, 99)
+        ccxt_base_adapter._live_clients[stale_key] = (Mock(), 0.0)
+        with app.app_context():
+            with patch.object(adapter_cls, '_get_cached_client', return_value=Mock()):
+                adapter_cls.get_client(1)
+        assert stale_key not in ccxt_base_adapter._live_clients
+
+    def test_get_client_concurrent_misses_build_once(self, app):
+        """Concurrent misses for the same key should share one client."""
+        adapter_cls = ExchangeRegistry.get_adapter('kraken')
+
+        def slow_build(user_id, portfolio_name="default"):
+            time.sleep(0.05)
+            return Mock()
+
+        with patch.object(adapter_cls, '_get_cached_client', side_effect=slow_build) as mock_get:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                clients = list(pool.map(lambda _: adapter_cls.get_client(1), range(4)))
+        assert mock_get.call_count == 1
+        assert all(c is clients[0] for c in clients)
+
+    def test_get_client_build_does_not_block_other_users(self, app):
+        """A slow client build for one user should not hold up another user's lookup."""
+        adapter_cls = ExchangeRegistry.get_adapter('kraken')
+        other_done = threading.Event()
+
+        def build(user_id, portfolio_name="default"):
+            if user_id == 1:
+                assert other_done.wait(timeout=5)
+            return Mock()
+
+        with patch.object(adapter_cls, '_get_cached_client', side_effect=build):
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                slow = pool.submit(adapter_cls.get_client, 1)
+                time.sleep(0.05)
+                assert adapter_cls.get_client(2) is not None
+                other_done.set()
+                assert slow.result(timeout=5) is not None
+
+    def test_client_lock_is_per_client_and_reentrant(self):
+        """client_lock should hand out one re-entrant lock per client key."""
+        adapter_cls = ExchangeRegistry.get_adapter('kraken')
+        lock = adapter_cls.client_lock(1)
+        assert adapter_cls.client_lock(1) is lock
+        assert adapter_cls.client_lock(2) is not lock
+        with lock:
+            assert lock.acquire(blocking=False)
+            lock.release()
+
+    def test_invalidate_client_forces_reload(self, app):
+        """invalidate_client should drop the memoised client."""
+        adapter_cls = ExchangeRegistry.get_adapter('kraken')
+        with app.app_context():
+            with patch.object(adapter_cls, '_get_cached_client', side_effect=[Mock(), Mock()]) as mock_get:
+                first = adapter_cls.get_client(1)
+                adapter_cls.invalidate_client(1)
+                assert adapter_cls.get_client(1) is not first
+                assert mock_get.call_count == 2
+
     def test_get_client_with_credentials(self, app):
         """get_client should return client if credentials exist."""
         with app.app_context():
@@ -66,6 +66,9 @@ class TestCoreWebhookPauseLogic:
             assert log is not None
             assert log.status == "ignored"
             assert "paused" in log.message.lower()
+            # Payload is stored as a JSON object, not a JSON-encoded string
+            assert log.payload == payload
+            assert log.to_dict()["payload"]["action"] == "sell"
     
     def test_active_strategy_processes_webhooks_normally(self, app, regular_user, dummy_cred):
         """Active strategies should process webhooks and attempt trades."""
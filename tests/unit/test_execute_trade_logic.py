@@ -268,6 +268,21 @@ def test_sell_executes_when_balance_sufficient(app, dummy_cred, strategy_with_as
     mock_adapter.execute_trade.assert_called_once()
 
 
+def test_trade_holds_client_lock_until_adapter_returns(app, dummy_cred, strategy_with_assets):
+    """The adapter's client lock should be held while the order is placed."""
+    mock_adapter = _make_mock_adapter()
+    lock = mock_adapter.client_lock.return_value
+    mock_adapter.execute_trade.side_effect = lambda **_kw: (
+        lock.__exit__.assert_not_called() or {"trade_executed": True}
+    )
+    result = _execute(
+        app, dummy_cred, strategy_with_assets, "sell", {"action": "sell"}, mock_adapter
+    )
+    assert result.get("trade_executed") is True
+    lock.__enter__.assert_called_once()
+    lock.__exit__.assert_called_once()
+
+
 def test_strategy_not_found_returns_error(app, dummy_cred):
     """Non-existent strategy_id → trade_executed=False with error status."""
     mock_adapter = _make_mock_adapter()
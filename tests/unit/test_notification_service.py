@@ -0,0 +1,63 @@
+"""Unit tests for app/services/notification_service.py."""
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from app import db
+from app.models import User, UserNotificationPreference
+from app.services.notification_service import (
+    ADMIN_NEW_USER_SIGNUP,
+    USER_TRANSACTION_ACTIVITY,
+    NotificationService,
+)
+
+
+class TestAdminNewUserSignup:
+    """Tests for NotificationService.send_admin_new_user_signup."""
+
+    def _set_pref(self, user_id: int, enabled: bool) -> None:
+        UserNotificationPreference.query.filter_by(
+            user_id=user_id, notif_type=ADMIN_NEW_USER_SIGNUP
+        ).delete()
+        db.session.add(UserNotificationPreference(
+            user_id=user_id, notif_type=ADMIN_NEW_USER_SIGNUP, enabled=enabled
+        ))
+        db.session.commit()
+
+    def test_emails_only_opted_in_admins(self, app, admin_user):
+        with app.app_context():
+            admin = User.query.filter_by(email="admin@example.com").first()
+            self._set_pref(admin.id, True)
+
+            with patch.object(NotificationService, "_send_email") as mock_send:
+                NotificationService.send_admin_new_user_signup("new@example.com")
+
+            mock_send.assert_called_once()
+            assert mock_send.call_args.kwargs["recipients"] == ["admin@example.com"]
+            assert mock_send.call_args.kwargs["context"]["new_user_email"] == "new@example.com"
+
+    def test_no_email_when_admin_opted_out(self, app, admin_user):
+        with app.app_context():
+            admin = User.query.filter_by(email="admin@example.com").first()
+            self._set_pref(admin.id, False)
+
+            with patch.object(NotificationService, "_send_email") as mock_send:
+                NotificationService.send_admin_new_user_signup("new@example.com")
+
+            mock_send.assert_not_called()
+
+
+class TestIsEnabled:
+    """Tests for NotificationService.is_enabled."""
+
+    def test_reads_stored_flag(self, app, regular_user):
+        with app.app_context():
+            user = User.query.filter_by(email="testuser@example.com").first()
+            UserNotificationPreference.query.filter_by(user_id=user.id).delete()
+            db.session.add(UserNotificationPreference(
+                user_id=user.id, notif_type=USER_TRANSACTION_ACTIVITY, enabled=True
+            ))
+            db.session.commit()
+
+            assert NotificationService.is_enabled(user.id, USER_TRANSACTION_ACTIVITY) is True
+            assert NotificationService.is_enabled(user.id, ADMIN_NEW_USER_SIGNUP) is False
@@ -1,8 +1,26 @@
 """Tests for price service (app/services/price_service.py)."""
 from unittest.mock import MagicMock, patch
+
+import pytest
+
 from app.services.price_service import PriceService
 
 
+def _reset_local_prices():
+    pinned = {s: PriceService._local_prices[s] for s in PriceService._USD_STABLECOINS}
+    PriceService._local_prices.clear()
+    PriceService._local_prices.update(pinned)
+    PriceService._local_expiry.clear()
+
+
+@pytest.fixture(autouse=True)
+def _clear_local_prices():
+    """Keep the per-process price copy from leaking between tests."""
+    _reset_local_prices()
+    yield
+    _reset_local_prices()
+
+
 def _mock_cache(stored=None):
     """Return a mock cache object backed by a simple dict."""
     store = stored if stored is not None else {}
@@ -19,7 +37,7 @@ class TestPriceServiceGetPriceUsd:
         """get_price_usd should return price for valid asset."""
         mock_cache = _mock_cache()
         with patch.object(PriceService, '_cache', return_value=mock_cache), \
-             patch('app.services.price_service.requests.get') as mock_get:
+             patch.object(PriceService._session, 'get') as mock_get:
             mock_get.return_value.json.return_value = {'bitcoin': {'usd': 45000}}
             mock_get.return_value.raise_for_status = MagicMock()
 
@@ -41,7 +59,7 @@ class TestPriceServiceGetPriceUsd:
         """get_price_usd should raise exception on API error."""
         mock_cache = _mock_cache()
         with patch.object(PriceService, '_cache', return_value=mock_cache), \
-             patch('app.services.price_service.requests.get') as mock_get:
+             patch.object(PriceService._session, 'get') as mock_get:
             mock_get.side_effect = Exception("API Error")
 
             try:
@@ -54,7 +72,7 @@ class TestPriceServiceGetPriceUsd:
         """get_price_usd should return cached result on second call."""
         mock_cache = _mock_cache()
         with patch.object(PriceService, '_cache', return_value=mock_cache), \
-             patch('app.services.price_service.requests.get') as mock_get:
+             patch.object(PriceService._session, 'get') as mock_get:
             mock_get.return_value.json.return_value = {'bitcoin': {'usd': 45000}}
             mock_get.return_value.raise_for_status = MagicMock()
 
@@ -64,11 +82,60 @@ class TestPriceServiceGetPriceUsd:
             assert price1 == price2
             assert mock_get.call_count == 1
 
+    def test_get_price_usd_prefers_local_copy(self):
+        """A fresh per-process price should be returned without touching the shared cache."""
+        mock_cache = _mock_cache()
+        PriceService._set_local('BTC', 44000.0)
+        with patch.object(PriceService, '_cache', return_value=mock_cache), \
+             patch.object(PriceService._session, 'get') as mock_get:
+            assert PriceService.get_price_usd('btc') == 44000.0
+            mock_cache.get.assert_not_called()
+            mock_get.assert_not_called()
+
+    def test_get_price_usd_awaits_inflight_fetch(self):
+        """Concurrent misses for the same symbol should share the pending fetch."""
+        from concurrent.futures import Future
+
+        pending = Future()
+        pending.set_result(46000.0)
+        mock_cache = _mock_cache()
+        with patch.object(PriceService, '_cache', return_value=mock_cache), \
+             patch.dict(PriceService._inflight, {'BTC': pending}), \
+             patch.object(PriceService._session, 'get') as mock_get:
+            price = PriceService.get_price_usd('BTC')
+
+            assert price == 46000.0
+            mock_get.assert_not_called()
+
+    def test_get_price_usd_stablecoin_pinned(self):
+        """Stablecoins should price at 1.0 without any API call."""
+        mock_cache = _mock_cache()
+        with patch.object(PriceService, '_cache', return_value=mock_cache), \
+             patch.object(PriceService._session, 'get') as mock_get:
+            assert PriceService.get_price_usd('usdc') == 1.0
+            assert PriceService.get_prices_usd_batch(['USD', 'USDT']) == {
+                'USD': 1.0, 'USDT': 1.0,
+            }
+            mock_get.assert_not_called()
+
+    def test_get_price_usd_force_refresh_skips_stablecoin_pin(self):
+        """force_refresh should fetch a stablecoin's live price but keep the pin."""
+        mock_cache = _mock_cache()
+        with patch.object(PriceService, '_cache', return_value=mock_cache), \
+             patch.object(PriceService, '_resolve_id', return_value='usd-coin'), \
+             patch.object(PriceService._session, 'get') as mock_get:
+            mock_get.return_value.json.return_value = {'usd-coin': {'usd': 0.9998}}
+            mock_get.return_value.raise_for_status = MagicMock()
+
+            assert PriceService.get_price_usd('USDC', force_refresh=True) == 0.9998
+            assert PriceService.get_price_usd('USDC') == 1.0
+            assert mock_get.call_count == 1
+
     def test_get_price_usd_force_refresh(self):
         """get_price_usd should bypass cache with force_refresh=True."""
         mock_cache = _mock_cache()
         with patch.object(PriceService, '_cache', return_value=mock_cache), \
-             patch('app.services.price_service.requests.get') as mock_get:
+             patch.object(PriceService._session, 'get') as mock_get:
             mock_get.return_value.json.return_value = {'bitcoin': {'usd': 45000}}
             mock_get.return_value.raise_for_status = MagicMock()
 
@@ -86,7 +153,7 @@ class TestPriceServiceGetPricesBatch:
         """get_prices_usd_batch should return prices for multiple assets."""
         mock_cache = _mock_cache()
         with patch.object(PriceService, '_cache', return_value=mock_cache), \
-             patch('app.services.price_service.requests.get') as mock_get:
+             patch.object(PriceService._session, 'get') as mock_get:
             mock_get.return_value.json.return_value = {
                 'bitcoin': {'usd': 45000},
                 'ethereum': {'usd': 3000},
@@ -106,7 +173,7 @@ class TestPriceServiceGetPricesBatch:
         """get_prices_usd_batch should not fetch symbols already in cache."""
         mock_cache = _mock_cache(stored={"price_usd_BTC": 45000.0})
         with patch.object(PriceService, '_cache', return_value=mock_cache), \
-             patch('app.services.price_service.requests.get') as mock_get:
+             patch.object(PriceService._session, 'get') as mock_get:
             mock_get.return_value.json.return_value = {'ethereum': {'usd': 3000}}
             mock_get.return_value.raise_for_status = MagicMock()
 
@@ -115,3 +182,57 @@ class TestPriceServiceGetPricesBatch:
             assert prices.get('ETH') == 3000
             # BTC was cached, so only one API call for ETH
             assert mock_get.call_count == 1
+
+    def test_get_prices_batch_failure_returns_partial(self):
+        """A failed batch call should not fan out into per-symbol requests."""
+        mock_cache = _mock_cache(stored={"price_usd_BTC": 45000.0})
+        with patch.object(PriceService, '_cache', return_value=mock_cache), \
+             patch.object(PriceService._session, 'get') as mock_get:
+            mock_get.side_effect = Exception("API Error")
+
+            prices = PriceService.get_prices_usd_batch(['BTC', 'ETH', 'SOL'])
+            assert prices == {'BTC': 45000.0}
+            assert mock_get.call_count == 1
+
+    def test_get_prices_batch_max_age_reuses_recent_fetch(self):
+        """max_age should reuse a just-fetched price but ignore the shared cache."""
+        mock_cache = _mock_cache(stored={"price_usd_ETH": 2900.0})
+        with patch.object(PriceService, '_cache', return_value=mock_cache), \
+             patch.object(PriceService._session, 'get') as mock_get:
+            PriceService._set_local('BTC', 45000.0)
+            mock_get.return_value.json.return_value = {'ethereum': {'usd': 3000}}
+            mock_get.return_value.raise_for_status = MagicMock()
+
+            prices = PriceService.get_prices_usd_batch(['BTC', 'ETH'], max_age=30)
+            assert prices == {'BTC': 45000.0, 'ETH': 3000}
+            assert mock_get.call_count == 1
+
+
+class TestPriceServiceSymbolMap:
+    """Test PriceService symbol map loading."""
+
+    def test_load_symbol_map_uses_shared_cache(self):
+        """_load_symbol_map should reuse a cached map instead of calling CoinGecko."""
+        mock_cache = _mock_cache(stored={"coingecko_symbol_map": {"PEPE": "pepe"}})
+        with patch.object(PriceService, '_cache', return_value=mock_cache), \
+             patch.object(PriceService, '_symbol_to_id', dict(PriceService._STATIC_SYMBOL_MAP)), \
+             patch.object(PriceService._session, 'get') as mock_get:
+            assert PriceService._resolve_id('PEPE') == 'pepe'
+            mock_get.assert_not_called()
+
+
+class TestPriceServiceLocalCopy:
+    """Test the per-process price copy kept in front of the shared cache."""
+
+    def test_sweep_drops_expired_prices(self):
+        """_sweep_local should evict expired entries but keep refreshed ones."""
+        with patch('app.services.price_service.time.monotonic', return_value=1000.0):
+            PriceService._set_local('BTC', 45000.0)
+            PriceService._set_local('ETH', 3000.0)
+        with patch('app.services.price_service.time.monotonic', return_value=1030.0):
+            PriceService._set_local('ETH', 3100.0)
+
+        PriceService._sweep_local(1070.0)
+
+        assert 'BTC' not in PriceService._local_prices
+        assert PriceService._local_prices['ETH'][0] == 3100.0
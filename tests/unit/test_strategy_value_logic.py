@@ -9,7 +9,7 @@ import os
 import uuid
 from decimal import Decimal
 from types import SimpleNamespace
-from unittest.mock import patch
+from unittest.mock import PropertyMock, patch
 
 import pytest
 
@@ -92,7 +92,7 @@ def test_value_usd_with_prices_both_assets():
     strat = _simple_strategy(base="0.1", quote="500")
     prices = {"BTC": 50000.0, "USDT": 1.0}
     result = _value_usd_with_prices(strat, prices)
-    assert result == Decimal("5500.00")
+    assert result == 5500.0
 
 
 def test_value_usd_with_prices_only_quote():
@@ -100,7 +100,7 @@ def test_value_usd_with_prices_only_quote():
     strat = _simple_strategy(base="0", quote="1000")
     prices = {"BTC": 50000.0, "USDT": 1.0}
     result = _value_usd_with_prices(strat, prices)
-    assert result == Decimal("1000.00")
+    assert result == 1000.0
 
 
 def test_value_usd_with_prices_missing_price_for_base():
@@ -109,7 +109,7 @@ def test_value_usd_with_prices_missing_price_for_base():
     prices = {"USDT": 1.0}  # no BTC price
     result = _value_usd_with_prices(strat, prices)
     # Only quote value: 500 * 1.0 = 500
-    assert result == Decimal("500.00")
+    assert result == 500.0
 
 
 # ---------------------------------------------------------------------------
@@ -118,20 +118,61 @@ def test_value_usd_with_prices_missing_price_for_base():
 
 
 def test_value_usd_fetches_live_prices(app):
-    """_value_usd calls PriceService.get_price_usd and calculates correctly."""
+    """_value_usd fetches both prices in one batch call and calculates correctly."""
     strat = _simple_strategy(base="0.1", quote="500")
 
-    def fake_get_price_usd(symbol, force_refresh=False):
-        return 50000.0 if symbol.upper() == "BTC" else 1.0
+    with app.app_context():
+        with patch(
+            "app.services.strategy_value_service.PriceService.get_prices_usd_batch",
+            return_value={"BTC": 50000.0, "USDT": 1.0},
+        ) as mock_batch:
+            result = _value_usd(strat)
+
+    assert result == 5500.0
+    mock_batch.assert_called_once_with(["BTC", "USDT"], max_age=30.0)
+
+
+def test_value_usd_price_fetch_failure_counts_as_zero(app):
+    """A failed batch fetch is logged and the strategy values to $0."""
+    strat = _simple_strategy(base="0.1", quote="500")
 
     with app.app_context():
         with patch(
-            "app.services.strategy_value_service.PriceService.get_price_usd",
-            side_effect=fake_get_price_usd,
+            "app.services.strategy_value_service.PriceService.get_prices_usd_batch",
+            side_effect=RuntimeError("boom"),
         ):
             result = _value_usd(strat)
 
-    assert result == Decimal("5500.00")
+    assert result == 0.0
+
+
+def test_value_usd_prices_only_held_sides(app):
+    """A side with no allocation is left out of the batch request."""
+    strat = _simple_strategy(base="0", quote="500")
+
+    with app.app_context():
+        with patch(
+            "app.services.strategy_value_service.PriceService.get_prices_usd_batch",
+            return_value={"USDT": 1.0},
+        ) as mock_batch:
+            result = _value_usd(strat)
+
+    assert result == 500.0
+    mock_batch.assert_called_once_with(["USDT"], max_age=30.0)
+
+
+def test_value_usd_zero_allocation_skips_price_fetch(app):
+    """A dormant strategy values to $0 without any price request."""
+    strat = _simple_strategy(base="0", quote="0")
+
+    with app.app_context():
+        with patch(
+            "app.services.strategy_value_service.PriceService.get_prices_usd_batch",
+        ) as mock_batch:
+            result = _value_usd(strat)
+
+    assert result == 0.0
+    mock_batch.assert_not_called()
 
 
 # ---------------------------------------------------------------------------
@@ -156,6 +197,25 @@ def test_snapshot_all_strategies_writes_history(app, dummy_cred):
     assert count >= 1
 
 
+def test_snapshot_replaces_todays_existing_snapshot(app, dummy_cred):
+    """A second snapshot on the same day replaces the first instead of adding to it."""
+    strat_id = _make_db_strategy(
+        app, dummy_cred, base_qty="0.1", quote_qty="500"
+    )
+
+    with app.app_context():
+        with patch(
+            "app.services.strategy_value_service.PriceService.get_prices_usd_batch",
+            return_value={"BTC": 50000.0, "USDT": 1.0},
+        ):
+            snapshot_all_strategies(source="test")
+            snapshot_all_strategies(source="test")
+
+        rows = StrategyValueHistory.query.filter_by(strategy_id=strat_id).all()
+    assert len(rows) == 1
+    assert rows[0].value_usd == Decimal("5500.00")
+
+
 def test_snapshot_skips_zero_value_with_assets(app, dummy_cred):
     """When calculated value is 0 but strategy has assets, no snapshot is written."""
     strat_id = _make_db_strategy(
@@ -195,3 +255,69 @@ def test_snapshot_does_nothing_with_no_strategies(app):
 
         # Should complete without raising
         snapshot_all_strategies(source="test")
+
+
+def test_snapshot_skips_price_fetch_when_no_allocations(app, dummy_cred):
+    """With every strategy at zero allocation, no price request is made."""
+    with app.app_context():
+        TradingStrategy.query.delete()
+        db.session.commit()
+    _make_db_strategy(app, dummy_cred, base_qty="0", quote_qty="0")
+
+    with app.app_context():
+        with patch(
+            "app.services.strategy_value_service.PriceService.get_prices_usd_batch",
+        ) as mock_batch:
+            snapshot_all_strategies(source="test")
+
+    mock_batch.assert_not_called()
+
+
+def test_snapshot_price_failure_requeues_on_scheduler(app, dummy_cred):
+    """A failed price fetch schedules the next attempt instead of sleeping."""
+    from app import scheduler
+
+    _make_db_strategy(app, dummy_cred, base_qty="1.0", quote_qty="0")
+
+    with app.app_context():
+        with patch(
+            "app.services.strategy_value_service.PriceService.get_prices_usd_batch",
+            side_effect=RuntimeError("api down"),
+        ), patch.object(
+            type(scheduler), "running", new_callable=PropertyMock, return_value=True
+        ), patch.object(scheduler, "add_job") as mock_add_job, patch(
+            "app.services.strategy_value_service.time.sleep"
+        ) as mock_sleep:
+            snapshot_all_strategies(source="test", max_retries=3)
+
+    mock_sleep.assert_not_called()
+    mock_add_job.assert_called_once()
+    kwargs = mock_add_job.call_args.kwargs
+    assert kwargs["trigger"] == "date"
+    assert kwargs["args"] == ["test", 3, 1]
+
+
+def test_snapshot_price_failure_retries_inline_without_scheduler(app, dummy_cred):
+    """Without a running scheduler the retry falls back to sleeping inline."""
+    from app import scheduler
+
+    _make_db_strategy(app, dummy_cred, base_qty="1.0", quote_qty="0")
+
+    with app.app_context():
+        with patch(
+            "app.services.strategy_value_service.PriceService.get_prices_usd_batch",
+            side_effect=RuntimeError("api down"),
+        ) as mock_batch, patch.object(
+            type(scheduler), "running", new_callable=PropertyMock, return_value=False
+        ), patch(
+            "app.services.strategy_value_service.time.sleep"
+        ) as mock_sleep:
+            # The streamed strategy cursor must be released before the backoff wait
+            def assert_no_open_transaction(_seconds):
+                assert not db.session().in_transaction()
+
+            mock_sleep.side_effect = assert_no_open_transaction
+            snapshot_all_strategies(source="test", max_retries=2)
+
+    assert mock_batch.call_count == 2
+    mock_sleep.assert_called_once_with(30)
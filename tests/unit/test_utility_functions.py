@@ -1,6 +1,8 @@
 """Tests for utility functions and helpers."""
 from decimal import Decimal
+from unittest.mock import patch
 from app.routes.api import _trim_decimal, _friendly_exchange
+from app.utils.rate_limiter import TokenBucket
 
 
 class TestTrimDecimal:
@@ -53,3 +55,25 @@ class TestFriendlyExchange:
     def test_friendly_exchange_multiple_ccxt_suffixes(self):
         """_friendly_exchange should only strip last -ccxt suffix."""
         assert _friendly_exchange("exchange-ccxt-ccxt") == "exchange-ccxt"
+
+
+class TestTokenBucket:
+    """Test the TokenBucket rate limiter."""
+
+    def test_token_bucket_allows_burst_up_to_capacity(self):
+        """acquire should not sleep while tokens remain."""
+        bucket = TokenBucket("test-burst", capacity=3, refill_per_second=1)
+        with patch('app.utils.rate_limiter.time.sleep') as mock_sleep:
+            for _ in range(3):
+                bucket.acquire()
+            mock_sleep.assert_not_called()
+
+    def test_token_bucket_sleeps_when_empty(self):
+        """acquire should wait for a refill once the bucket is drained."""
+        bucket = TokenBucket("test-empty", capacity=1, refill_per_second=2)
+        with patch('app.utils.rate_limiter.time.monotonic', return_value=100.0), \
+             patch('app.utils.rate_limiter.time.sleep') as mock_sleep:
+            bucket.last = 100.0
+            bucket.acquire()
+            bucket.acquire()
+            mock_sleep.assert_called_once_with(0.5)